@@ -0,0 +1,26 @@
+"""
+Scraping of GitHub repositories and analysis of their descriptions.
+
+The functions below take and return in-memory objects, so several stages can run
+in one process without writing intermediate files.
+"""
+
+from .scraping import harvest_corpus, write_corpus, collect_counts, fetch_data_from_github
+from .withword2vec import load_texts as load_corpus, get_top_words, train_embeddings
+from .tfidf import compute_tfidf
+from .wc import render_wordclouds
+from .languages import LANGS, LanguageRegistry
+
+__all__ = [
+    'LANGS',
+    'LanguageRegistry',
+    'collect_counts',
+    'compute_tfidf',
+    'fetch_data_from_github',
+    'get_top_words',
+    'harvest_corpus',
+    'load_corpus',
+    'render_wordclouds',
+    'train_embeddings',
+    'write_corpus',
+]
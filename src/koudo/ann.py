@@ -0,0 +1,301 @@
+import os
+
+import numpy as np
+
+# 語彙がこれより小さければ総当たりでも十分速い
+FLAT_THRESHOLD = 10000
+
+# IVF の構築時に総当たりの結果と比べて確かめる recall@10 の目標
+TARGET_RECALL = 0.9
+
+def _normalize(x: np.ndarray) -> np.ndarray:
+    x = np.asarray(x, dtype=np.float32)
+    norms = np.linalg.norm(x, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return x / norms
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Indices of the k largest scores along the last axis, best first.
+    """
+    k = min(k, scores.shape[-1])
+    part = np.argpartition(-scores, k - 1, axis=-1)[..., :k]
+    order = np.argsort(-np.take_along_axis(scores, part, axis=-1), axis=-1)
+    return np.take_along_axis(part, order, axis=-1)
+
+class FlatIndex:
+    """
+    Exact cosine search by one matrix product per batch of queries.
+    """
+    kind = 'flat'
+
+    def __init__(self, vectors: np.ndarray):
+        self.vectors = vectors
+
+    def search(self, queries: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+        scores = queries @ self.vectors.T
+        ids = _top_k(scores, k)
+        return ids, np.take_along_axis(scores, ids, axis=-1)
+
+    def state(self) -> dict:
+        return {}
+
+    @classmethod
+    def from_state(cls, vectors: np.ndarray, state: dict, path: str) -> 'FlatIndex':
+        return cls(vectors)
+
+class IVFIndex:
+    """
+    Inverted-file index: vectors are grouped by their nearest k-means centroid and a
+    query only scans the n_probe closest groups.
+    n_probe is raised at build time until the recall against exact search reaches the target.
+    """
+    kind = 'ivf'
+
+    def __init__(self, vectors: np.ndarray, centroids: np.ndarray, order: np.ndarray, offsets: np.ndarray, n_probe: int = 8, recall: float = float('nan')):
+        self.vectors = vectors
+        self.centroids = centroids
+        self.order = order
+        self.offsets = offsets
+        self.n_probe = min(n_probe, len(centroids))
+        self.recall = recall
+
+    @classmethod
+    def build(cls, vectors: np.ndarray, n_lists: int | None = None, n_probe: int | None = None, iterations: int = 10, seed: int = 42, chunk: int = 65536, target_recall: float | None = TARGET_RECALL) -> 'IVFIndex':
+        """
+        :param vectors: Normalized vectors.
+        :param n_lists: Number of k-means groups (default is sqrt of the vocabulary size).
+        :param n_probe: Groups scanned per query (default is 1/8 of the groups, at least 8).
+        :param target_recall: Raise n_probe until recall@10 against exact search reaches this (None to skip).
+        """
+        n = len(vectors)
+        if n_lists is None:
+            n_lists = max(1, int(np.sqrt(n)))
+        n_lists = min(n_lists, n)
+        if n_probe is None:
+            n_probe = max(8, n_lists // 8)
+        rng = np.random.default_rng(seed)
+        centroids = vectors[rng.choice(n, n_lists, replace=False)].copy()
+
+        def assign(c: np.ndarray) -> np.ndarray:
+            # 語彙が大きくてもメモリに収まるよう分割して計算する
+            return np.concatenate([np.argmax(vectors[i:i + chunk] @ c.T, axis=1) for i in range(0, n, chunk)])
+
+        # spherical k-means (コサイン類似度)
+        for _ in range(iterations):
+            labels = assign(centroids)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, vectors)
+            filled = np.bincount(labels, minlength=n_lists) > 0
+            centroids[filled] = _normalize(sums[filled])
+
+        labels = assign(centroids)
+        order = np.argsort(labels, kind='stable')
+        offsets = np.concatenate([[0], np.cumsum(np.bincount(labels, minlength=n_lists))])
+        index = cls(vectors, centroids, order, offsets, n_probe)
+        if target_recall is not None:
+            index.calibrate(target_recall, seed=seed)
+        return index
+
+    def measure_recall(self, queries: np.ndarray, k: int = 10) -> float:
+        """
+        Fraction of the exact k nearest neighbors of the queries that the index finds.
+        """
+        exact, _ = FlatIndex(self.vectors).search(queries, k)
+        ids, _ = self.search(queries, k)
+        return float(np.mean([len(np.intersect1d(a, b)) / k for a, b in zip(ids, exact)]))
+
+    def calibrate(self, target_recall: float = TARGET_RECALL, k: int = 10, sample: int = 256, seed: int = 42) -> float:
+        """
+        Double n_probe until recall@k on a sample of the vocabulary reaches the target
+        (at worst every group is scanned, which is exact).
+
+        :return: The measured recall.
+        """
+        rng = np.random.default_rng(seed)
+        queries = self.vectors[np.sort(rng.choice(len(self.vectors), min(sample, len(self.vectors)), replace=False))]
+        self.recall = self.measure_recall(queries, k)
+        while self.recall < target_recall and self.n_probe < len(self.centroids):
+            self.n_probe = min(2 * self.n_probe, len(self.centroids))
+            self.recall = self.measure_recall(queries, k)
+        return self.recall
+
+    def search(self, queries: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+        probes = _top_k(queries @ self.centroids.T, self.n_probe)
+        ids = np.full((len(queries), k), -1, dtype=np.int64)
+        scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        for i, (query, lists) in enumerate(zip(queries, probes)):
+            candidates = np.concatenate([self.order[self.offsets[l]:self.offsets[l + 1]] for l in lists])
+            candidate_scores = self.vectors[candidates] @ query
+            best = _top_k(candidate_scores, k)
+            ids[i, :len(best)] = candidates[best]
+            scores[i, :len(best)] = candidate_scores[best]
+        return ids, scores
+
+    def state(self) -> dict:
+        return {'centroids': self.centroids, 'order': self.order, 'offsets': self.offsets, 'n_probe': self.n_probe, 'recall': self.recall}
+
+    @classmethod
+    def from_state(cls, vectors: np.ndarray, state: dict, path: str) -> 'IVFIndex':
+        return cls(vectors, state['centroids'], state['order'], state['offsets'], int(state['n_probe']), float(state.get('recall', np.nan)))
+
+class HNSWIndex:
+    """
+    Graph index from hnswlib (optional dependency).
+    """
+    kind = 'hnsw'
+
+    def __init__(self, index, ef: int = 64):
+        self.index = index
+        self.index.set_ef(ef)
+
+    @classmethod
+    def build(cls, vectors: np.ndarray, m: int = 16, ef_construction: int = 200, ef: int = 64) -> 'HNSWIndex':
+        import hnswlib
+
+        index = hnswlib.Index(space='cosine', dim=vectors.shape[1])
+        index.init_index(max_elements=len(vectors), ef_construction=ef_construction, M=m)
+        index.add_items(vectors, np.arange(len(vectors)))
+        return cls(index, ef)
+
+    def search(self, queries: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+        self.index.set_ef(max(k, self.index.ef))
+        ids, distances = self.index.knn_query(queries, k=k)
+        return ids.astype(np.int64), (1.0 - distances).astype(np.float32)
+
+    def state(self) -> dict:
+        return {'ef': self.index.ef}
+
+    def save_sidecar(self, path: str) -> None:
+        self.index.save_index(f"{path}.hnsw")
+
+    @classmethod
+    def from_state(cls, vectors: np.ndarray, state: dict, path: str) -> 'HNSWIndex':
+        import hnswlib
+
+        index = hnswlib.Index(space='cosine', dim=vectors.shape[1])
+        index.load_index(f"{path}.hnsw", max_elements=len(vectors))
+        return cls(index, int(state['ef']))
+
+_KINDS = {cls.kind: cls for cls in (FlatIndex, IVFIndex, HNSWIndex)}
+
+def _hnswlib_available() -> bool:
+    try:
+        import hnswlib  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+class NeighborIndex:
+    """
+    Nearest-neighbor search over the vocabulary of a KeyedVectors with batched queries.
+    """
+
+    def __init__(self, wv, index, vectors: np.ndarray):
+        self.wv = wv
+        self.index = index
+        self.vectors = vectors
+
+    def most_similar(self, words: list[str], k: int = 10) -> list[list[tuple[str, float]]]:
+        """
+        Nearest words for each query word (the word itself is excluded).
+
+        :param words: Query words; words outside the vocabulary get an empty list.
+        :param k: Number of neighbors per word.
+        :return: One list of (word, cosine similarity) per query word.
+        """
+        key_to_index = self.wv.key_to_index
+        known = [i for i, w in enumerate(words) if w in key_to_index]
+        results: list[list[tuple[str, float]]] = [[] for _ in words]
+        if not known:
+            return results
+
+        query_ids = np.array([key_to_index[words[i]] for i in known])
+        ids, scores = self.index.search(self.vectors[query_ids], k + 1)
+        index_to_key = self.wv.index_to_key
+        for row, i in enumerate(known):
+            results[i] = [
+                (index_to_key[j], float(s))
+                for j, s in zip(ids[row], scores[row])
+                if j >= 0 and j != query_ids[row]
+            ][:k]
+        return results
+
+    def save(self, path: str) -> str:
+        """
+        Save the index structure next to the model, with the normalized vectors as a
+        separate .npy so that every process can memory-map them instead of normalizing a copy.
+        """
+        np.save(vectors_path(path), np.ascontiguousarray(self.vectors, dtype=np.float32))
+        with open(path, 'wb') as f:
+            np.savez(f, kind=self.index.kind, **self.index.state())
+        if isinstance(self.index, HNSWIndex):
+            self.index.save_sidecar(path)
+        return path
+
+def build_index(wv, kind: str = 'auto', **kwargs) -> NeighborIndex:
+    """
+    Build a nearest-neighbor index over a KeyedVectors.
+
+    :param wv: gensim KeyedVectors.
+    :param kind: 'flat' (exact), 'ivf' (NumPy), 'hnsw' (hnswlib) or 'auto'.
+    :return: NeighborIndex.
+    """
+    vectors = _normalize(wv.vectors)
+    if kind == 'auto':
+        if len(vectors) < FLAT_THRESHOLD:
+            kind = 'flat'
+        else:
+            kind = 'hnsw' if _hnswlib_available() else 'ivf'
+
+    if kind == 'flat':
+        index = FlatIndex(vectors)
+    elif kind == 'ivf':
+        index = IVFIndex.build(vectors, **kwargs)
+    elif kind == 'hnsw':
+        index = HNSWIndex.build(vectors, **kwargs)
+    else:
+        raise ValueError(f"Unknown index kind: {kind}")
+    return NeighborIndex(wv, index, vectors)
+
+def load_index(wv, path: str, mmap: str | None = 'r') -> NeighborIndex:
+    """
+    Load an index saved by NeighborIndex.save for the same KeyedVectors.
+
+    :param wv: gensim KeyedVectors or MappedVectors.
+    :param path: Path of the saved index.
+    :param mmap: Memory-map mode of the normalized vectors (None reads them into memory).
+    :return: NeighborIndex.
+    """
+    if os.path.exists(vectors_path(path)):
+        vectors = np.load(vectors_path(path), mmap_mode=mmap)
+    else:
+        vectors = _normalize(wv.vectors)
+    with np.load(path) as data:
+        state = {key: data[key] for key in data.files}
+    kind = str(state.pop('kind'))
+    return NeighborIndex(wv, _KINDS[kind].from_state(vectors, state, path), vectors)
+
+def index_path(embeddings_path: str) -> str:
+    """
+    Path of the index saved next to a KeyedVectors file.
+    """
+    return f"{embeddings_path}.ann.npz"
+
+def vectors_path(path: str) -> str:
+    """
+    Path of the normalized vectors saved with an index.
+    """
+    return f"{path}.vectors.npy"
+
+def load_or_build_index(wv, embeddings_path: str, kind: str = 'auto') -> NeighborIndex:
+    """
+    Load the index next to the model if it is newer than the model, otherwise build and save it.
+    """
+    path = index_path(embeddings_path)
+    saved = [path, vectors_path(path)]
+    if all(os.path.exists(p) and os.path.getmtime(p) >= os.path.getmtime(embeddings_path) for p in saved):
+        return load_index(wv, path)
+    index = build_index(wv, kind)
+    index.save(path)
+    return index
@@ -0,0 +1,312 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from dataclasses import dataclass, field
+from typing import Callable
+
+from .languages import LANGS, colors_for
+from .parallel import map_tasks
+
+# 成果物はディレクトリ単位で内容のハッシュをキーに保存する:
+#   <root>/objects/<digest[:2]>/<digest>/  タスクの出力ファイル
+#   <root>/tasks/<key>                     タスクの入力・パラメータのハッシュ -> 出力の digest
+# 入力とパラメータが同じタスクは実行せずに保存済みの出力を使う
+
+def hash_file(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+def hash_tree(directory: str) -> str:
+    """
+    Digest of every file name and content under a directory.
+    """
+    h = hashlib.sha256()
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            h.update(os.path.relpath(path, directory).encode('utf-8'))
+            h.update(hash_file(path).encode('ascii'))
+    return h.hexdigest()
+
+class ArtifactStore:
+    """
+    Content-addressed store of task output directories.
+    """
+
+    def __init__(self, root: str = 'data/artifacts'):
+        self.root = root
+
+    def object_dir(self, digest: str) -> str:
+        return os.path.join(self.root, 'objects', digest[:2], digest)
+
+    def lookup(self, key: str) -> str | None:
+        """
+        Output digest recorded for a task key, if its objects still exist.
+        """
+        path = os.path.join(self.root, 'tasks', key)
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            digest = f.read().strip()
+        return digest if os.path.isdir(self.object_dir(digest)) else None
+
+    def new_dir(self) -> str:
+        tmp = os.path.join(self.root, 'tmp')
+        os.makedirs(tmp, exist_ok=True)
+        return tempfile.mkdtemp(dir=tmp)
+
+    def commit(self, key: str, directory: str) -> str:
+        """
+        Move a finished output directory into the store and record it for the task key.
+        """
+        digest = hash_tree(directory)
+        target = self.object_dir(digest)
+        if os.path.isdir(target):
+            shutil.rmtree(directory)
+        else:
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            os.replace(directory, target)
+        os.makedirs(os.path.join(self.root, 'tasks'), exist_ok=True)
+        with open(os.path.join(self.root, 'tasks', key), 'w') as f:
+            f.write(digest)
+        return digest
+
+@dataclass(frozen=True)
+class Output:
+    """
+    Reference to a file in the output directory of another task.
+    """
+    task: str
+    name: str
+
+@dataclass
+class Task:
+    """
+    One node of the build graph.
+
+    fn(out_dir, inputs, **params) writes its outputs into out_dir; inputs maps each input
+    name to a file path (a corpus file or an upstream Output resolved in the store).
+    """
+    name: str
+    fn: Callable[..., None]
+    inputs: dict[str, 'str | Output'] = field(default_factory=dict)
+    params: dict = field(default_factory=dict)
+    version: str = '1'
+
+class Graph:
+    """
+    Tasks run in dependency order; a task is rerun only when the hash of its inputs,
+    parameters or version changed.
+    """
+
+    def __init__(self, store: ArtifactStore):
+        self.store = store
+        self.tasks: dict[str, Task] = {}
+        self.digests: dict[str, str] = {}
+        self.ran: list[str] = []
+        self.cached: list[str] = []
+
+    def add(self, task: Task) -> Task:
+        for ref in task.inputs.values():
+            if isinstance(ref, Output) and ref.task not in self.tasks:
+                raise ValueError(f"Task '{task.name}' depends on unknown task '{ref.task}'")
+        self.tasks[task.name] = task
+        return task
+
+    def path(self, ref: Output) -> str:
+        """
+        Path of an upstream output after the task has run.
+        """
+        return os.path.join(self.store.object_dir(self.digests[ref.task]), ref.name)
+
+    def _dependencies(self, targets: list[str]) -> set[str]:
+        needed, stack = set(), list(targets)
+        while stack:
+            name = stack.pop()
+            if name in needed:
+                continue
+            needed.add(name)
+            stack.extend(ref.task for ref in self.tasks[name].inputs.values() if isinstance(ref, Output))
+        return needed
+
+    def _key(self, task: Task) -> tuple[str, dict[str, str]]:
+        paths, hashes = {}, {}
+        for name, ref in task.inputs.items():
+            if isinstance(ref, Output):
+                paths[name] = self.path(ref)
+                hashes[name] = f"{self.digests[ref.task]}/{ref.name}"
+            else:
+                paths[name] = ref
+                hashes[name] = hash_file(ref)
+        spec = {'task': task.name, 'version': task.version, 'params': task.params, 'inputs': hashes}
+        key = hashlib.sha256(json.dumps(spec, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+        return key, paths
+
+    def run(self, targets: list[str] | None = None, force: bool = False, workers: int | None = None) -> dict[str, str]:
+        """
+        Bring the targets (default: every task) up to date.
+        Tasks whose inputs are ready run together in the process pool of parallel.map_tasks,
+        one dependency level at a time (e.g. every per-language task at once).
+
+        :param targets: Names of the tasks to build, with their dependencies.
+        :param force: Rerun every task even if its output is stored.
+        :param workers: Number of processes (default is default_workers(); 1 runs every task in this process).
+        :return: Dict of task name to output directory.
+        """
+        needed = self._dependencies(targets if targets is not None else list(self.tasks))
+        pending = [task for task in self.tasks.values() if task.name in needed]
+        while pending:
+            ready = [task for task in pending if all(ref.task in self.digests for ref in task.inputs.values() if isinstance(ref, Output))]
+            pending = [task for task in pending if task not in ready]
+
+            jobs = []
+            for task in ready:
+                key, paths = self._key(task)
+                digest = None if force else self.store.lookup(key)
+                if digest is not None:
+                    self.cached.append(task.name)
+                    self.digests[task.name] = digest
+                else:
+                    jobs.append((task, key, self.store.new_dir(), paths))
+
+            try:
+                seconds = map_tasks(_run_task, [(task.fn, out_dir, paths, task.params) for task, _, out_dir, paths in jobs], workers)
+            except BaseException:
+                for _, _, out_dir, _ in jobs:
+                    shutil.rmtree(out_dir, ignore_errors=True)
+                raise
+            for (task, key, out_dir, _), elapsed in zip(jobs, seconds):
+                self.digests[task.name] = self.store.commit(key, out_dir)
+                self.ran.append(task.name)
+                print(f"[run] {task.name} ({elapsed:.1f}s)")
+        return {name: self.store.object_dir(self.digests[name]) for name in needed}
+
+def _run_task(fn: Callable[..., None], out_dir: str, inputs: dict, params: dict) -> float:
+    # ワーカープロセスで 1 タスクを実行し，かかった秒数を返す
+    start = time.perf_counter()
+    fn(out_dir, inputs, **params)
+    return time.perf_counter() - start
+
+# 各タスクの処理: 入力はファイルパス，出力は out_dir に書く
+
+def _read(path: str) -> str:
+    with open(path, encoding='utf-8') as f:
+        return f.read()
+
+def _write_json(path: str, obj) -> None:
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(obj, f, ensure_ascii=False)
+
+def _tfidf_task(out_dir: str, inputs: dict, top: int) -> None:
+    from .tfidf import compute_tfidf
+
+    _write_json(os.path.join(out_dir, 'terms.json'), compute_tfidf({'corpus': _read(inputs['corpus'])}, top=top)['corpus'])
+
+def _wordcloud_task(out_dir: str, inputs: dict, lang: str, fmt: str) -> None:
+    from .wc import render_wordclouds, save_wordcloud
+
+    wc = render_wordclouds({lang: _read(inputs['corpus'])})[lang]
+    save_wordcloud(wc, lang, os.path.join(out_dir, f"wordcloud.{fmt}"))
+
+def _top_words_task(out_dir: str, inputs: dict, top_n: int) -> None:
+    from .withword2vec import top_words_of_files
+
+    _write_json(os.path.join(out_dir, 'words.json'), top_words_of_files({'corpus': inputs['corpus']}, top_n)['corpus'])
+
+def _word2vec_task(out_dir: str, inputs: dict) -> None:
+    from .withword2vec import save_embeddings, train_embeddings
+
+    wv = train_embeddings({lang: _read(path) for lang, path in inputs.items()})
+    if wv is None:
+        raise ValueError("No sentences to train Word2Vec model")
+    save_embeddings(wv, os.path.join(out_dir, 'w2v.kv'))
+
+def _tsne_task(out_dir: str, inputs: dict, perplexity: int) -> None:
+    from .withword2vec import load_embeddings, tsne_coordinates
+
+    with open(inputs['words'], encoding='utf-8') as f:
+        words = json.load(f)
+    reduced, labels = tsne_coordinates(words, load_embeddings(inputs['model']), perplexity)
+    _write_json(os.path.join(out_dir, 'coordinates.json'), {'points': reduced.tolist(), 'labels': labels})
+
+def _tsne_plot_task(out_dir: str, inputs: dict, fmt: str, colors: list[str]) -> None:
+    import numpy as np
+    from .withword2vec import plot_tsne_coordinates
+
+    coordinates = {}
+    for lang, path in inputs.items():
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        coordinates[lang] = (np.asarray(data['points'], dtype=float).reshape(-1, 2), data['labels'])
+    plot_tsne_coordinates(coordinates, out_dir, fmt, colors)
+
+def analysis_graph(store: ArtifactStore, data_dir: str = 'data', langs: list[str] = LANGS, top: int = 10, top_n: int = 100, perplexity: int = 30, fmt: str = 'png') -> Graph:
+    """
+    Graph of the corpus analyses (TF-IDF, word clouds, Word2Vec and t-SNE).
+    Per-language tasks only read their own corpus file, so adding a language runs only
+    its tasks plus the ones that combine every language (Word2Vec and the t-SNE plot).
+
+    :param store: Artifact store.
+    :param data_dir: Directory of the description corpus.
+    :param langs: Languages to analyse.
+    :param top: Number of TF-IDF terms per language.
+    :param top_n: Number of top words per language for t-SNE.
+    :param perplexity: t-SNE perplexity.
+    :param fmt: Plot file format.
+    :return: Graph.
+    """
+    graph = Graph(store)
+    corpus = {lang: os.path.join(data_dir, f"{lang}.txt") for lang in langs}
+    for lang, path in corpus.items():
+        graph.add(Task(f"tfidf:{lang}", _tfidf_task, {'corpus': path}, {'top': top}))
+        graph.add(Task(f"wordcloud:{lang}", _wordcloud_task, {'corpus': path}, {'lang': lang, 'fmt': fmt}))
+        graph.add(Task(f"top-words:{lang}", _top_words_task, {'corpus': path}, {'top_n': top_n}))
+
+    graph.add(Task('word2vec', _word2vec_task, dict(corpus)))
+    for lang in langs:
+        graph.add(Task(f"tsne:{lang}", _tsne_task, {
+            'model': Output('word2vec', 'w2v.kv'),
+            'words': Output(f"top-words:{lang}", 'words.json'),
+        }, {'perplexity': perplexity}))
+    # 色は言語レジストリで変わるので，パラメータに入れてキャッシュのキーに含める
+    graph.add(Task('tsne-plot', _tsne_plot_task, {lang: Output(f"tsne:{lang}", 'coordinates.json') for lang in langs}, {'fmt': fmt, 'colors': colors_for(langs)}))
+    return graph
+
+def build(langs: list[str] = LANGS, data_dir: str = 'data', output_dir: str = '.', fmt: str = 'png', artifacts_dir: str = 'data/artifacts', embeddings_path: str | None = None, top: int = 10, top_n: int = 100, perplexity: int = 30, force: bool = False, workers: int | None = None) -> Graph:
+    """
+    Run the analysis graph and copy its results to the usual places
+    (result_3-*.png, 4-2.png, 4-3.png in output_dir and the word vectors to embeddings_path).
+
+    :param workers: Number of processes running the tasks (default is default_workers()).
+    :return: The graph after running (ran/cached list the task names).
+    """
+    graph = analysis_graph(ArtifactStore(artifacts_dir), data_dir, langs, top=top, top_n=top_n, perplexity=perplexity, fmt=fmt)
+    graph.run(force=force, workers=workers)
+
+    os.makedirs(output_dir, exist_ok=True)
+    for i, lang in enumerate(langs):
+        shutil.copyfile(graph.path(Output(f"wordcloud:{lang}", f"wordcloud.{fmt}")), os.path.join(output_dir, f"result_3-{i+1}.{fmt}"))
+    for name in (f'4-2.{fmt}', f'4-3.{fmt}'):
+        shutil.copyfile(graph.path(Output('tsne-plot', name)), os.path.join(output_dir, name))
+
+    if embeddings_path and ('word2vec' in graph.ran or not os.path.exists(embeddings_path)):
+        from .ann import build_index, index_path
+        from .withword2vec import load_embeddings, save_embeddings
+
+        wv = load_embeddings(graph.path(Output('word2vec', 'w2v.kv')), mmap=None)
+        save_embeddings(wv, embeddings_path)
+        build_index(wv).save(index_path(embeddings_path))
+
+    for lang in langs:
+        with open(graph.path(Output(f"tfidf:{lang}", 'terms.json')), encoding='utf-8') as f:
+            terms = json.load(f)
+        print(f"{lang}: {', '.join(term for term, _ in terms)}")
+    print(f"{len(graph.ran)} tasks run, {len(graph.cached)} up to date")
+    return graph
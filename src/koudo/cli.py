@@ -0,0 +1,274 @@
+import argparse
+import os
+import sys
+
+from .languages import LANGS, LanguageRegistry, colors_for, set_default_registry
+from .profiling import profile, tracer
+
+# 重いライブラリ (matplotlib, gensim, sklearn, wordcloud) はサブコマンドの中でだけ import する
+
+def _output(args, name: str) -> str:
+    os.makedirs(args.output_dir, exist_ok=True)
+    return os.path.join(args.output_dir, f"{name}.{args.format}")
+
+def _embeddings(args) -> str:
+    # .npy を指定すると生の行列 + 語彙の形式で保存・読み込みする
+    return args.embeddings or os.path.join(args.cache_dir, 'w2v.kv')
+
+def _registry_path(args) -> str:
+    return os.path.join(args.cache_dir, 'languages.json')
+
+def _resolve_langs(args) -> None:
+    # koudo languages で作った言語一覧があれば，色の割り当てと --langs の既定値に使う
+    path = _registry_path(args)
+    if os.path.exists(path):
+        registry = LanguageRegistry.load(path)
+        set_default_registry(registry)
+        if args.langs is None:
+            args.langs = registry.names
+    if args.langs is None:
+        args.langs = list(LANGS)
+
+def _store(args):
+    from .store import ResultStore
+
+    return ResultStore(os.path.join(args.cache_dir, 'results.sqlite3'))
+
+def cmd_scrape(args) -> None:
+    from . import scraping
+
+    csv_path = os.path.join(args.cache_dir, 'result_1-1.csv')
+    if args.replot:
+        scraping.plot_stars_by_id(scraping.load_repositories_frame(csv_path), _output(args, 'result_1-1'), args.langs, colors_for(args.langs))
+    else:
+        os.makedirs(args.cache_dir, exist_ok=True)
+        scraping.plot_top_repositories(args.langs, per_page=args.per_page, csv_path=csv_path, image_path=_output(args, 'result_1-1'))
+
+def cmd_counts(args) -> None:
+    from . import scraping
+
+    csv_path = os.path.join(args.cache_dir, 'result_2-2.csv')
+    if args.replot:
+        scraping.plot_prs_and_issues(scraping.load_repositories_frame(csv_path), _output(args, 'result_2-2'), args.langs, colors_for(args.langs))
+    else:
+        scraping.plot_counts(
+            args.langs,
+            per_page=args.per_page,
+            days=args.days,
+            workers=args.concurrency,
+            store=_store(args),
+            csv_path=csv_path,
+            image_path=_output(args, 'result_2-2'),
+            details=args.details,
+            windows=args.windows,
+            windows_csv_path=os.path.join(args.cache_dir, 'result_2-2_windows.csv'),
+        )
+
+def cmd_corpus(args) -> None:
+    from . import scraping
+
+    if args.sharded:
+        scraping.harvest_descriptions_sharded(args.langs, min_stars=args.min_stars, workers=args.concurrency, data_dir=args.data_dir, dedup=not args.no_dedup)
+    else:
+        scraping.harvest_descriptions(args.langs, pages=args.pages, data_dir=args.data_dir, dedup=not args.no_dedup)
+
+def cmd_enrich(args) -> None:
+    from .graphql import enrich_store
+
+    enrich_store(_store(args), workers=args.concurrency, refresh=args.refresh)
+
+def cmd_dedup(args) -> None:
+    from . import scraping
+
+    scraping.dedup_descriptions(args.langs, data_dir=args.data_dir, threshold=args.threshold)
+
+def cmd_tfidf(args) -> None:
+    from . import tfidf
+
+    tfidf.main(args.langs, data_dir=args.data_dir, top=args.top, workers=args.concurrency)
+
+def cmd_wordcloud(args) -> None:
+    from . import wc
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    wc.main(args.langs, data_dir=args.data_dir, output_dir=args.output_dir, fmt=args.format, workers=args.concurrency)
+
+def cmd_w2v(args) -> None:
+    from . import withword2vec
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    withword2vec.main(args.data_dir, args.langs, top_n=args.top_n, output_dir=args.output_dir, fmt=args.format, embeddings_path=_embeddings(args), workers=args.concurrency)
+
+def cmd_build(args) -> None:
+    from .build import build
+
+    build(
+        args.langs,
+        data_dir=args.data_dir,
+        output_dir=args.output_dir,
+        fmt=args.format,
+        artifacts_dir=os.path.join(args.cache_dir, 'artifacts'),
+        embeddings_path=_embeddings(args),
+        top=args.top,
+        top_n=args.top_n,
+        perplexity=args.perplexity,
+        force=args.force,
+        workers=args.concurrency,
+    )
+
+def cmd_neighbors(args) -> None:
+    from .ann import load_or_build_index
+    from .withword2vec import get_top_words_from_files, load_embeddings
+
+    embeddings_path = _embeddings(args)
+    wv = load_embeddings(embeddings_path)
+    index = load_or_build_index(wv, embeddings_path, kind=args.index)
+
+    if args.words:
+        queries = {'query': args.words}
+    else:
+        # 各言語の頻出語の近傍をまとめて求める
+        queries = get_top_words_from_files(args.data_dir, args.langs, top_n=args.top_n, workers=args.concurrency)
+
+    for name, words in queries.items():
+        print(f"[{name}]")
+        for word, neighbors in zip(words, index.most_similar(words, args.k)):
+            print(f"{word:16}: {', '.join(w for w, _ in neighbors)}")
+
+def cmd_serve(args) -> None:
+    from .service import serve
+
+    serve(args.host, args.port, data_dir=args.data_dir, langs=args.langs, embeddings_path=_embeddings(args))
+
+def cmd_languages(args) -> None:
+    if args.source == 'linguist':
+        registry = LanguageRegistry.from_linguist(tuple(args.types))
+    elif args.source == 'store':
+        registry = LanguageRegistry.from_store(_store(args), min_repositories=args.min_repos)
+    else:
+        registry = LanguageRegistry(LANGS)
+    if args.limit:
+        registry = LanguageRegistry(registry.names[:args.limit], {n: registry.color(n) for n in registry.names[:args.limit]})
+
+    for name, color in zip(registry.names, registry.colors(registry.names)):
+        print(f"{color} {name}")
+    print(f"{len(registry)} languages written to {registry.save(_registry_path(args))}")
+
+def cmd_ratelimit(args) -> None:
+    from . import scraping
+
+    scraping.print_rate_limit()
+
+def build_parser() -> argparse.ArgumentParser:
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--langs', nargs='+', help=f'languages to process (default: <cache-dir>/languages.json if it exists, otherwise {" ".join(LANGS)})')
+    common.add_argument('--data-dir', default='data', help='directory of the description corpus')
+    common.add_argument('--cache-dir', default='data', help='directory of the result store and saved frames')
+    common.add_argument('--output-dir', default='.', help='directory for plots')
+    common.add_argument('--format', default='png', choices=['png', 'pdf', 'svg'], help='plot file format')
+    common.add_argument('--embeddings', help='word vectors file (default: <cache-dir>/w2v.kv; use a .npy path for the raw matrix format)')
+    common.add_argument('-j', '--concurrency', type=int, default=4, help='number of concurrent workers')
+    common.add_argument('--trace', help='write timing spans as Chrome trace JSON to this path and print a summary')
+    common.add_argument('--metrics-port', type=int, help='serve Prometheus metrics on this local port while running')
+    common.add_argument('--metrics-dump', help="write Prometheus metrics to this path at exit ('-' for stdout)")
+    common.add_argument('--profile', choices=['cprofile', 'tracemalloc'], help='also profile functions (cProfile) or allocations (tracemalloc)')
+
+    parser = argparse.ArgumentParser(prog='koudo', description='GitHub repository scraping and description analysis.')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('scrape', parents=[common], help='plot repository ID against stars (mode 0)')
+    p.add_argument('--per-page', type=int, default=100)
+    p.add_argument('--replot', action='store_true', help='re-plot from the saved frame without scraping')
+    p.set_defaults(func=cmd_scrape)
+
+    p = sub.add_parser('counts', parents=[common], help='plot PR and issue counts after creation (mode 1)')
+    p.add_argument('--per-page', type=int, default=25)
+    p.add_argument('--days', type=int, default=180)
+    p.add_argument('--replot', action='store_true', help='re-plot from the saved frame without scraping')
+    p.add_argument('--details', action='store_true', help='also store languages, topics and contributors via GraphQL')
+    p.add_argument('--windows', choices=['daily', 'weekly', 'monthly'], help='also count PRs and issues per window (saved to the store and result_2-2_windows.csv)')
+    p.set_defaults(func=cmd_counts)
+
+    p = sub.add_parser('enrich', parents=[common], help='add languages, topics and contributors to stored repositories via GraphQL')
+    p.add_argument('--refresh', action='store_true', help='refetch details of every stored repository')
+    p.set_defaults(func=cmd_enrich)
+
+    p = sub.add_parser('corpus', parents=[common], help='harvest repository descriptions (mode 2)')
+    p.add_argument('--pages', type=int, default=5, help='search pages of 100 repositories (at most 10)')
+    p.add_argument('--sharded', action='store_true', help='use the sharded crawler to get past the 1000-result cap')
+    p.add_argument('--min-stars', type=int, default=10, help='minimum stars for --sharded')
+    p.add_argument('--no-dedup', action='store_true', help='keep duplicate descriptions')
+    p.set_defaults(func=cmd_corpus)
+
+    p = sub.add_parser('dedup', parents=[common], help='drop duplicate descriptions from the harvested corpus')
+    p.add_argument('--threshold', type=float, default=None, help='near-duplicate Jaccard similarity (default 0.8)')
+    p.set_defaults(func=cmd_dedup)
+
+    p = sub.add_parser('tfidf', parents=[common], help='print top TF-IDF terms per language')
+    p.add_argument('--top', type=int, default=10)
+    p.set_defaults(func=cmd_tfidf)
+
+    p = sub.add_parser('wordcloud', parents=[common], help='render a word cloud per language')
+    p.set_defaults(func=cmd_wordcloud)
+
+    p = sub.add_parser('w2v', parents=[common], help='train Word2Vec and plot t-SNE of top words')
+    p.add_argument('--top-n', type=int, default=100)
+    p.set_defaults(func=cmd_w2v)
+
+    p = sub.add_parser('build', parents=[common], help='run TF-IDF, word clouds, Word2Vec and t-SNE, reusing unchanged results')
+    p.add_argument('--top', type=int, default=10, help='TF-IDF terms per language')
+    p.add_argument('--top-n', type=int, default=100, help='top words per language for t-SNE')
+    p.add_argument('--perplexity', type=int, default=30, help='t-SNE perplexity')
+    p.add_argument('--force', action='store_true', help='rerun every step')
+    p.set_defaults(func=cmd_build)
+
+    p = sub.add_parser('neighbors', parents=[common], help='nearest words from the Word2Vec index')
+    p.add_argument('--words', nargs='+', help='query words (default: top words of each language)')
+    p.add_argument('--top-n', type=int, default=30, help='top words per language to query')
+    p.add_argument('-k', type=int, default=10, help='neighbors per word')
+    p.add_argument('--index', default='auto', choices=['auto', 'flat', 'ivf', 'hnsw'], help='index kind when the index has to be built')
+    p.set_defaults(func=cmd_neighbors)
+
+    p = sub.add_parser('serve', parents=[common], help='answer top-terms, similarity and neighbor queries over HTTP')
+    p.add_argument('--host', default='127.0.0.1')
+    p.add_argument('--port', type=int, default=8000)
+    p.set_defaults(func=cmd_serve)
+
+    p = sub.add_parser('languages', parents=[common], help='write the language registry used by default for --langs and plot colors')
+    p.add_argument('--source', default='linguist', choices=['linguist', 'store', 'default'], help="GitHub linguist data, the languages of collected repositories, or the built-in list")
+    p.add_argument('--types', nargs='+', default=['programming'], help='linguist language types to include')
+    p.add_argument('--min-repos', type=int, default=1, help='minimum collected repositories of a language for --source store')
+    p.add_argument('--limit', type=int, help='keep only the first N languages')
+    p.set_defaults(func=cmd_languages)
+
+    p = sub.add_parser('ratelimit', parents=[common], help='print the GitHub API rate limit (mode 9)')
+    p.set_defaults(func=cmd_ratelimit)
+
+    return parser
+
+def main(argv: list[str] | None = None) -> None:
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    args = build_parser().parse_args(argv if argv is not None else sys.argv[1:])
+    _resolve_langs(args)
+    if args.trace or args.profile:
+        tracer.enable()
+    if args.metrics_port is not None or args.metrics_dump:
+        from . import metrics
+
+        if args.metrics_port is not None:
+            metrics.serve_metrics(args.metrics_port)
+        if args.metrics_dump:
+            metrics.dump_at_exit(args.metrics_dump)
+    try:
+        with profile(args.profile, path=os.path.join(args.output_dir, 'profile')):
+            args.func(args)
+    finally:
+        if tracer.enabled:
+            if args.trace:
+                print(f"Trace written to {tracer.export_chrome_trace(args.trace)}")
+            tracer.print_summary()
+
+if __name__ == "__main__":
+    main()
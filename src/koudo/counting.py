@@ -0,0 +1,91 @@
+import heapq
+import os
+import re
+from collections import Counter
+from operator import itemgetter
+
+from .parallel import map_tasks
+from .profiling import tracer
+
+# 1 ブロックあたりのバイト数 (ファイルはこの単位で読み，単語の途中では切らない)
+BLOCK_SIZE = 16 * 1024 * 1024
+
+_WORD = re.compile(r'\b\w+\b')
+_WHITESPACE = b' \t\n\r\f\v'
+
+def block_ranges(path: str, block_size: int = BLOCK_SIZE) -> list[tuple[int, int]]:
+    """
+    Split a file into byte ranges of about block_size that end on whitespace.
+    Only a few bytes around each boundary are read, so this is cheap for any file size.
+
+    :param path: Text file path.
+    :param block_size: Target size of a block in bytes.
+    :return: List of (start, end) byte offsets.
+    """
+    size = os.path.getsize(path)
+    ranges = []
+    start = 0
+    with open(path, 'rb') as f:
+        while start < size:
+            end = min(start + block_size, size)
+            # 空白が見つかるまで境界を後ろにずらす (UTF-8 の文字も途中で切れない)
+            f.seek(end)
+            while end < size:
+                chunk = f.read(4096)
+                if not chunk:
+                    break
+                cut = next((i for i, b in enumerate(chunk) if b in _WHITESPACE), -1)
+                if cut >= 0:
+                    end += cut
+                    break
+                end += len(chunk)
+            end = min(end, size)
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+def count_text(text: str, stop_words: frozenset = frozenset()) -> Counter:
+    """
+    Count lower-cased words of a text, skipping stop words.
+    """
+    return Counter(w for w in _WORD.findall(text.lower()) if w not in stop_words)
+
+def count_block(path: str, start: int, end: int, stop_words: frozenset = frozenset()) -> Counter:
+    """
+    Count lower-cased words of one byte range, skipping stop words.
+    """
+    with tracer.span('count_block', bytes=end - start) as span:
+        with open(path, 'rb') as f:
+            f.seek(start)
+            text = f.read(end - start).decode('utf-8', errors='ignore')
+        counts = count_text(text, stop_words)
+        span.items = len(counts)
+    return counts
+
+def count_files(paths: dict[str, str], stop_words: frozenset = frozenset(), workers: int | None = None, block_size: int = BLOCK_SIZE) -> dict[str, Counter]:
+    """
+    Count words of several files, with the blocks of every file counted in parallel processes.
+
+    :param paths: Dict of key (e.g. language) to file path.
+    :param stop_words: Words to skip.
+    :param workers: Number of worker processes (default is default_workers(); 1 counts in this process).
+    :param block_size: Target size of a block in bytes.
+    :return: Dict of key to merged Counter.
+    """
+    tasks = [
+        (key, (path, start, end))
+        for key, path in paths.items()
+        for start, end in block_ranges(path, block_size)
+    ]
+    counts = {key: Counter() for key in paths}
+    # ブロックの結果はファイル内の順に足すので，同数の単語の順序は 1 回で数えたときと同じ
+    blocks = map_tasks(count_block, [(*block, stop_words) for _, block in tasks], workers)
+    for (key, _), partial in zip(tasks, blocks):
+        counts[key].update(partial)
+    return counts
+
+def top_n(counter: Counter, n: int) -> list[tuple[str, int]]:
+    """
+    The n most common words using a heap instead of sorting the whole vocabulary.
+    """
+    return heapq.nlargest(n, counter.items(), key=itemgetter(1))
@@ -0,0 +1,138 @@
+import math
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+from .languages import search_qualifier
+from .ratelimit import RateLimiter, search_limiter
+from .scraping import fetch_data_from_github
+
+# search API は 1 クエリにつき 1000 件までしか返さない
+SEARCH_RESULT_CAP = 1000
+SEARCH_PER_PAGE = 100
+FIRST_CREATED = date(2008, 1, 1)
+
+@dataclass(frozen=True)
+class Shard:
+    """
+    A slice of a repository search, bounded by inclusive stars and created ranges.
+    """
+    min_stars: int
+    max_stars: int
+    created_from: date
+    created_to: date
+
+    def query(self, language: str) -> str:
+        return (
+            f"{search_qualifier(language)}"
+            f"+stars:{self.min_stars}..{self.max_stars}"
+            f"+created:{self.created_from.isoformat()}..{self.created_to.isoformat()}"
+        )
+
+def split_shard(shard: Shard) -> list[Shard]:
+    """
+    Bisect a shard, by stars while the stars range is wider than one value, otherwise by created date.
+
+    :param shard: The shard to split.
+    :return: Two child shards, or an empty list if the shard cannot be split further.
+    """
+    if shard.min_stars < shard.max_stars:
+        mid = (shard.min_stars + shard.max_stars) // 2
+        return [
+            Shard(shard.min_stars, mid, shard.created_from, shard.created_to),
+            Shard(mid + 1, shard.max_stars, shard.created_from, shard.created_to),
+        ]
+    if shard.created_from < shard.created_to:
+        mid = shard.created_from + (shard.created_to - shard.created_from) // 2
+        return [
+            Shard(shard.min_stars, shard.max_stars, shard.created_from, mid),
+            Shard(shard.min_stars, shard.max_stars, mid + timedelta(days=1), shard.created_to),
+        ]
+    return []
+
+def _search(language: str, shard: Shard, per_page: int, page: int, limiter: RateLimiter) -> dict:
+    limiter.acquire()
+    url = (
+        f"https://api.github.com/search/repositories?q={shard.query(language)}"
+        f"&sort=stars&order=desc&per_page={per_page}&page={page}"
+    )
+    _, data = fetch_data_from_github(url)
+    return data
+
+def get_max_stars(language: str, limiter: RateLimiter = search_limiter) -> int:
+    """
+    Get the star count of the most starred repository for a language.
+    """
+    limiter.acquire()
+    url = f"https://api.github.com/search/repositories?q={search_qualifier(language)}&sort=stars&order=desc&per_page=1"
+    _, data = fetch_data_from_github(url)
+    if not data.get('items'):
+        return 0
+    return int(data['items'][0]['stargazers_count'])
+
+def plan_shards(language: str, root: Shard, max_workers: int = 4, limiter: RateLimiter = search_limiter) -> list[tuple[Shard, int]]:
+    """
+    Recursively bisect shards until every shard has at most SEARCH_RESULT_CAP results.
+
+    :param language: The programming language to search.
+    :param root: The shard covering the whole search.
+    :param max_workers: Number of concurrent total_count queries.
+    :param limiter: Rate limiter shared by all search calls.
+    :return: List of (shard, total_count) with total_count > 0.
+    """
+    leaves = []
+    pending = [root]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while pending:
+            totals = list(executor.map(lambda s: int(_search(language, s, 1, 1, limiter)['total_count']), pending))
+            next_pending = []
+            for shard, total in zip(pending, totals):
+                if total == 0:
+                    continue
+                if total <= SEARCH_RESULT_CAP:
+                    leaves.append((shard, total))
+                    continue
+                children = split_shard(shard)
+                if children:
+                    next_pending.extend(children)
+                else:
+                    # 1 日・同一スター数でも 1000 件を超える場合は上限までで諦める
+                    print(f"Warning: shard {shard.query(language)} has {total} results, only {SEARCH_RESULT_CAP} can be fetched.")
+                    leaves.append((shard, total))
+            pending = next_pending
+    return leaves
+
+def crawl_repositories(language: str, min_stars: int = 0, max_stars: int | None = None, created_from: date = FIRST_CREATED, created_to: date | None = None, max_workers: int = 4, limiter: RateLimiter = search_limiter) -> list[dict]:
+    """
+    Harvest repositories for a language beyond the 1000-result search cap by sharding the query.
+
+    :param language: The programming language to search.
+    :param min_stars: Minimum number of stars.
+    :param max_stars: Maximum number of stars (default is the current maximum for the language).
+    :param created_from: First creation date to include.
+    :param created_to: Last creation date to include (default is today).
+    :param max_workers: Number of concurrent search requests.
+    :param limiter: Rate limiter shared by all search calls.
+    :return: Repository items deduplicated by id, sorted by stars (descending).
+    """
+    if max_stars is None:
+        max_stars = get_max_stars(language, limiter)
+    if created_to is None:
+        created_to = date.today()
+
+    leaves = plan_shards(language, Shard(min_stars, max_stars, created_from, created_to), max_workers, limiter)
+
+    tasks = [
+        (shard, page)
+        for shard, total in leaves
+        for page in range(1, math.ceil(min(total, SEARCH_RESULT_CAP) / SEARCH_PER_PAGE) + 1)
+    ]
+
+    repositories = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pages = executor.map(lambda task: _search(language, task[0], SEARCH_PER_PAGE, task[1], limiter), tasks)
+        for data in pages:
+            for item in data.get('items', []):
+                repositories[item['id']] = item
+
+    return sorted(repositories.values(), key=lambda item: item['stargazers_count'], reverse=True)
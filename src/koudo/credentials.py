@@ -0,0 +1,163 @@
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+
+from .metrics import rate_limit_remaining
+from .profiling import tracer
+
+# トークンごとの既定の上限 (ヘッダを受け取る前の推定値)
+DEFAULT_LIMITS = {
+    'core': 5000,
+    'search': 30,
+    'graphql': 5000,
+}
+
+# secondary rate limit で Retry-After がないときにトークンを休ませる秒数
+SECONDARY_RATE_LIMIT_PAUSE = 60.0
+
+class NoUsableTokenError(Exception):
+    """
+    Raised when the pool has tokens but every one of them has been rejected.
+    """
+
+def resource_for_url(url: str) -> str:
+    """
+    Guess the GitHub rate limit resource an API URL is counted against.
+    """
+    if '/search/' in url:
+        return 'search'
+    if url.rstrip('/').endswith('/graphql'):
+        return 'graphql'
+    return 'core'
+
+@dataclass
+class TokenState:
+    token: str
+    remaining: dict[str, int] = field(default_factory=dict)
+    reset: dict[str, float] = field(default_factory=dict)
+    quarantined: bool = False
+
+    def headroom(self, resource: str, now: float) -> int:
+        if resource not in self.remaining or self.reset.get(resource, 0) <= now:
+            return DEFAULT_LIMITS.get(resource, DEFAULT_LIMITS['core'])
+        return self.remaining[resource]
+
+class TokenPool:
+    """
+    Pool of GitHub tokens that sends each request to the token with the most remaining quota.
+    """
+
+    def __init__(self, tokens: list[str]):
+        """
+        :param tokens: Personal access tokens (duplicates and empty strings are ignored).
+        """
+        self._lock = threading.Lock()
+        self._states = [TokenState(t) for t in dict.fromkeys(t.strip() for t in tokens) if t]
+
+    @classmethod
+    def from_env(cls) -> 'TokenPool':
+        """
+        Load tokens from GITHUB_API_TOKENS (comma separated) and GITHUB_API_TOKEN.
+        """
+        tokens = os.getenv('GITHUB_API_TOKENS', '').split(',')
+        tokens.append(os.getenv('GITHUB_API_TOKEN', ''))
+        return cls(tokens)
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def available(self) -> int:
+        """
+        Number of tokens that are not quarantined.
+        """
+        with self._lock:
+            return sum(not s.quarantined for s in self._states)
+
+    def acquire(self, resource: str = 'core') -> str | None:
+        """
+        Pick the token with the most headroom for a resource.
+        If every token is exhausted, wait until the earliest reset.
+
+        :param resource: 'core', 'search' or 'graphql'.
+        :return: A token, or None if the pool is empty.
+        :raises NoUsableTokenError: If every token has been quarantined.
+        """
+        while True:
+            with self._lock:
+                if not self._states:
+                    return None
+                now = time.time()
+                candidates = [s for s in self._states if not s.quarantined]
+                if not candidates:
+                    # トークンがあるのに匿名でリクエストすると上限がずっと低くなるので止める
+                    raise NoUsableTokenError(f"All {len(self._states)} GitHub tokens were rejected (401)")
+                best = max(candidates, key=lambda s: s.headroom(resource, now))
+                if best.headroom(resource, now) > 0:
+                    # 並行リクエストで同じトークンに集中しないよう先に減らしておく
+                    if resource in best.remaining and best.reset.get(resource, 0) > now:
+                        best.remaining[resource] -= 1
+                    return best.token
+                wait = min(s.reset.get(resource, now) for s in candidates) - now
+            with tracer.span('token.wait', resource=resource):
+                time.sleep(max(wait, 1.0))
+
+    def update(self, token: str, headers: dict, status_code: int, resource: str = 'core', secondary_rate_limit: bool = False) -> None:
+        """
+        Record quota state from a response, quarantining tokens that were rejected (401).
+        Rate-limited tokens are only paused until they can be used again.
+
+        :param token: The token used for the request.
+        :param headers: Response headers.
+        :param status_code: Response status code.
+        :param resource: Resource guessed from the URL (X-RateLimit-Resource takes precedence).
+        :param secondary_rate_limit: The response is GitHub's secondary rate limit.
+        """
+        with self._lock:
+            state = next((s for s in self._states if s.token == token), None)
+            if state is None:
+                return
+
+            resource = headers.get('X-RateLimit-Resource', resource)
+            if 'X-RateLimit-Remaining' in headers:
+                state.remaining[resource] = int(headers['X-RateLimit-Remaining'])
+                rate_limit_remaining.set(state.remaining[resource], token=f"...{token[-4:]}", resource=resource)
+            if 'X-RateLimit-Reset' in headers:
+                state.reset[resource] = float(headers['X-RateLimit-Reset'])
+
+            if status_code == 401:
+                # 無効・失効したトークン
+                state.quarantined = True
+            elif status_code in (403, 429) and ('Retry-After' in headers or secondary_rate_limit):
+                # secondary rate limit: 指定された秒数 (なければ SECONDARY_RATE_LIMIT_PAUSE) だけ使わない
+                # (リポジトリごとの権限不足の 403 はトークン自体の問題ではないので隔離しない)
+                state.remaining[resource] = 0
+                state.reset[resource] = time.time() + float(headers.get('Retry-After', SECONDARY_RATE_LIMIT_PAUSE))
+
+    def status(self) -> list[dict]:
+        """
+        Snapshot of each token's state (tokens are masked).
+        """
+        with self._lock:
+            return [
+                {
+                    'token': f"...{s.token[-4:]}",
+                    'quarantined': s.quarantined,
+                    'remaining': dict(s.remaining),
+                    'reset': dict(s.reset),
+                }
+                for s in self._states
+            ]
+
+_default_pool: TokenPool | None = None
+_default_pool_lock = threading.Lock()
+
+def default_token_pool() -> TokenPool:
+    """
+    Return the process-wide pool, loading the tokens from the environment on first use.
+    """
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = TokenPool.from_env()
+        return _default_pool
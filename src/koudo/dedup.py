@@ -0,0 +1,115 @@
+import hashlib
+import re
+import zlib
+from dataclasses import dataclass
+
+import numpy as np
+
+# MinHash / LSH のパラメータ: 8 バンド x 8 行で，Jaccard 係数がおよそ 0.77 以上の組が候補になる
+NUM_PERM = 64
+BANDS = 8
+SHINGLE_SIZE = 5
+THRESHOLD = 0.8
+
+_MERSENNE_PRIME = np.uint64((1 << 31) - 1)
+
+@dataclass
+class DedupReport:
+    total: int = 0
+    exact: int = 0
+    near: int = 0
+
+    @property
+    def kept(self) -> int:
+        return self.total - self.exact - self.near
+
+    def __str__(self) -> str:
+        removed = self.exact + self.near
+        ratio = removed / self.total if self.total else 0.0
+        return f"{self.total} -> {self.kept} ({self.exact} exact, {self.near} near duplicates, {ratio:.1%} removed)"
+
+def normalize(text: str) -> str:
+    return re.sub(r'\s+', ' ', text.lower()).strip()
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> set[str]:
+    """
+    Character shingles of a normalized text (the whole text if it is shorter than size).
+    """
+    if len(text) <= size:
+        return {text}
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+class MinHasher:
+    """
+    MinHash signatures from NUM_PERM universal hash functions over CRC32 shingle hashes.
+    """
+
+    def __init__(self, num_perm: int = NUM_PERM, seed: int = 42):
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(1, int(_MERSENNE_PRIME), size=num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, int(_MERSENNE_PRIME), size=num_perm, dtype=np.uint64)
+
+    def signature(self, items: set[str]) -> np.ndarray:
+        hashes = np.fromiter((zlib.crc32(s.encode('utf-8')) & 0x7FFFFFFF for s in items), dtype=np.uint64, count=len(items))
+        # (a * x + b) mod p: a, x < 2^31 なので uint64 で桁あふれしない
+        permuted = (hashes[:, None] * self.a[None, :] + self.b[None, :]) % _MERSENNE_PRIME
+        return permuted.min(axis=0)
+
+def deduplicate(lines: list[str], threshold: float = THRESHOLD, bands: int = BANDS, hasher: MinHasher | None = None) -> tuple[list[str], DedupReport]:
+    """
+    Drop exact duplicates (by hash of the normalized text) and near duplicates (by MinHash/LSH),
+    keeping the first occurrence.
+
+    :param lines: Texts in their original order.
+    :param threshold: Estimated Jaccard similarity above which a text is a near duplicate.
+    :param bands: Number of LSH bands (must divide the number of permutations).
+    :param hasher: MinHasher to use (default is a new one with NUM_PERM permutations).
+    :return: (kept texts, report).
+    """
+    if hasher is None:
+        hasher = MinHasher()
+    rows = len(hasher.a) // bands
+
+    report = DedupReport(total=len(lines))
+    seen_hashes = set()
+    buckets: list[dict[bytes, list[int]]] = [{} for _ in range(bands)]
+    signatures: list[np.ndarray] = []
+    kept = []
+
+    for line in lines:
+        norm = normalize(line)
+        digest = hashlib.sha1(norm.encode('utf-8')).digest()
+        if digest in seen_hashes:
+            report.exact += 1
+            continue
+        seen_hashes.add(digest)
+
+        sig = hasher.signature(shingles(norm))
+        keys = [sig[b * rows:(b + 1) * rows].tobytes() for b in range(bands)]
+        candidates = {i for band, key in zip(buckets, keys) for i in band.get(key, ())}
+        if any(np.mean(signatures[i] == sig) >= threshold for i in candidates):
+            report.near += 1
+            continue
+
+        index = len(signatures)
+        signatures.append(sig)
+        for band, key in zip(buckets, keys):
+            band.setdefault(key, []).append(index)
+        kept.append(line)
+
+    return kept, report
+
+def deduplicate_corpus(corpus: dict[str, list[str]], threshold: float = THRESHOLD) -> tuple[dict[str, list[str]], dict[str, DedupReport]]:
+    """
+    Deduplicate each language's descriptions separately.
+
+    :param corpus: Dict of language to list of descriptions.
+    :param threshold: Estimated Jaccard similarity above which a text is a near duplicate.
+    :return: (deduplicated corpus, dict of language to report).
+    """
+    hasher = MinHasher()
+    result, reports = {}, {}
+    for lang, lines in corpus.items():
+        result[lang], reports[lang] = deduplicate(lines, threshold, hasher=hasher)
+        print(f"{lang}: {reports[lang]}")
+    return result, reports
@@ -0,0 +1,137 @@
+import os
+from collections.abc import Mapping
+
+import numpy as np
+
+# 生の行列形式: <prefix>.npy (float32 の埋め込み行列), <prefix>.vocab.npy (行順の単語),
+# <prefix>.sorted.npy (辞書順の単語), <prefix>.order.npy (辞書順の単語の行番号).
+# どれも np.load(mmap_mode='r') で読めるので，読み込み時間は語彙数によらない
+
+def _sidecar(path: str, name: str) -> str:
+    return f"{path[:-len('.npy')]}.{name}.npy"
+
+class SortedVocab(Mapping):
+    """
+    Read-only word -> row mapping backed by a sorted, memory-mapped word array.
+    Lookups are binary searches, so nothing has to be built when loading.
+    """
+
+    def __init__(self, words: np.ndarray, sorted_words: np.ndarray, order: np.ndarray):
+        self._words = words
+        self._sorted = sorted_words
+        self._order = order
+
+    def lookup(self, keys: list[str]) -> np.ndarray:
+        """
+        Rows of many words at once (-1 for words outside the vocabulary).
+        """
+        sorted_words = self._sorted
+        keys = list(keys)
+        # 固定長の文字列に変換すると長い単語が切り詰められて別の単語に一致するので，
+        # 語彙の最長の単語より長いものは先に除いておく
+        width = sorted_words.dtype.itemsize // np.dtype('U1').itemsize
+        fits = np.fromiter((len(k) <= width for k in keys), dtype=bool, count=len(keys))
+        keys = np.asarray(keys, dtype=sorted_words.dtype)
+        pos = np.searchsorted(sorted_words, keys)
+        pos = np.minimum(pos, len(sorted_words) - 1)
+        found = fits & (sorted_words[pos] == keys)
+        return np.where(found, self._order[pos], -1)
+
+    def __getitem__(self, key: str) -> int:
+        row = int(self.lookup([key])[0])
+        if row < 0:
+            raise KeyError(f"Key '{key}' not present")
+        return row
+
+    def __contains__(self, key) -> bool:
+        return isinstance(key, str) and int(self.lookup([key])[0]) >= 0
+
+    def __iter__(self):
+        return (str(w) for w in self._words)
+
+    def __len__(self) -> int:
+        return len(self._words)
+
+class MappedVectors:
+    """
+    Word vectors loaded from the raw matrix format with memory mapping.
+    Provides the parts of gensim's KeyedVectors used in this package.
+    """
+
+    def __init__(self, vectors: np.ndarray, words: np.ndarray, sorted_words: np.ndarray, order: np.ndarray):
+        self.vectors = vectors
+        self.index_to_key = words
+        self.key_to_index = SortedVocab(words, sorted_words, order)
+        self.vector_size = vectors.shape[1]
+        self._normed = None
+
+    @classmethod
+    def load(cls, path: str, mmap: str | None = 'r') -> 'MappedVectors':
+        return cls(
+            np.load(path, mmap_mode=mmap),
+            np.load(_sidecar(path, 'vocab'), mmap_mode=mmap),
+            np.load(_sidecar(path, 'sorted'), mmap_mode=mmap),
+            np.load(_sidecar(path, 'order'), mmap_mode=mmap),
+        )
+
+    def __contains__(self, word: str) -> bool:
+        return word in self.key_to_index
+
+    def __getitem__(self, word: str) -> np.ndarray:
+        return self.vectors[self.key_to_index[word]]
+
+    def get_normed_vectors(self) -> np.ndarray:
+        if self._normed is None:
+            norms = np.linalg.norm(self.vectors, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            self._normed = (self.vectors / norms).astype(np.float32)
+        return self._normed
+
+    def similarity(self, a: str, b: str) -> float:
+        va, vb = self[a], self[b]
+        return float(np.dot(va, vb) / (np.linalg.norm(va) * np.linalg.norm(vb)))
+
+    def most_similar(self, word: str, topn: int = 10) -> list[tuple[str, float]]:
+        normed = self.get_normed_vectors()
+        row = self.key_to_index[word]
+        scores = normed @ normed[row]
+        scores[row] = -np.inf
+        best = np.argsort(-scores)[:topn]
+        return [(str(self.index_to_key[i]), float(scores[i])) for i in best]
+
+def save_vectors(wv, path: str) -> str:
+    """
+    Save KeyedVectors in the raw matrix format (path must end with .npy).
+
+    :param wv: gensim KeyedVectors (or MappedVectors).
+    :param path: Output path of the embedding matrix.
+    :return: The output path.
+    """
+    if not path.endswith('.npy'):
+        raise ValueError(f"Raw vectors path must end with .npy: {path}")
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    words = np.asarray(list(wv.index_to_key), dtype=str)
+    np.save(path, np.ascontiguousarray(wv.vectors, dtype=np.float32))
+    order = np.argsort(words, kind='stable')
+    np.save(_sidecar(path, 'vocab'), words)
+    np.save(_sidecar(path, 'sorted'), words[order])
+    np.save(_sidecar(path, 'order'), order)
+    return path
+
+def lookup_vectors(wv, words: list[str]) -> tuple[np.ndarray, list[str]]:
+    """
+    Gather the vectors of many words with one fancy-index into wv.vectors.
+
+    :param wv: gensim KeyedVectors or MappedVectors.
+    :param words: Words to look up; words outside the vocabulary are dropped.
+    :return: (contiguous float32 matrix with one row per found word, the found words).
+    """
+    key_to_index = wv.key_to_index
+    if isinstance(key_to_index, SortedVocab):
+        rows = key_to_index.lookup(words) if words else np.empty(0, dtype=np.int64)
+    else:
+        rows = np.fromiter((key_to_index.get(w, -1) for w in words), dtype=np.int64, count=len(words))
+
+    found = rows >= 0
+    labels = [w for w, ok in zip(words, found) if ok]
+    return np.ascontiguousarray(wv.vectors[rows[found]], dtype=np.float32), labels
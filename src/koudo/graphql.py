@@ -0,0 +1,106 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from .scraping import fetch_data_from_github
+from .store import ResultStore, default_store
+
+GRAPHQL_URL = 'https://api.github.com/graphql'
+
+# nodes(ids:) は 1 回のクエリで 100 件まで
+NODES_PER_QUERY = 100
+
+# 1 リポジトリあたりの追加情報 (REST だとリポジトリごとに languages / topics / contributors の呼び出しが要る)
+REPOSITORY_DETAILS_QUERY = """
+query($ids: [ID!]!) {
+  nodes(ids: $ids) {
+    ... on Repository {
+      id
+      databaseId
+      nameWithOwner
+      forkCount
+      primaryLanguage { name }
+      languages(first: 10, orderBy: {field: SIZE, direction: DESC}) {
+        edges { size node { name } }
+      }
+      repositoryTopics(first: 20) {
+        nodes { topic { name } }
+      }
+      mentionableUsers { totalCount }
+    }
+  }
+}
+"""
+
+class GraphQLError(Exception):
+    """
+    Raised when a GraphQL response has errors and no data.
+    """
+
+def parse_repository(node: dict) -> dict:
+    """
+    Convert a Repository node into the detail fields of the repository store.
+    mentionableUsers (users who can be mentioned, i.e. contributors and collaborators)
+    stands in for the contributor count, which GraphQL does not expose.
+
+    :param node: Repository node of the response.
+    :return: Dict for ResultStore.put_repository_details.
+    """
+    return {
+        'id': node['databaseId'],
+        'full_name': node['nameWithOwner'],
+        'node_id': node['id'],
+        'primary_language': (node.get('primaryLanguage') or {}).get('name'),
+        'languages': {e['node']['name']: e['size'] for e in node['languages']['edges']},
+        'topics': [n['topic']['name'] for n in node['repositoryTopics']['nodes']],
+        'contributor_count': node['mentionableUsers']['totalCount'],
+        'fork_count': node['forkCount'],
+    }
+
+def fetch_repository_details(node_ids: list[str]) -> list[dict]:
+    """
+    Fetch the details of up to NODES_PER_QUERY repositories with one GraphQL query.
+    IDs that no longer resolve (deleted or private repositories) are skipped.
+
+    :param node_ids: GraphQL node IDs (the node_id of REST/search items).
+    :return: List of detail dicts.
+    """
+    _, data = fetch_data_from_github(GRAPHQL_URL, payload={'query': REPOSITORY_DETAILS_QUERY, 'variables': {'ids': node_ids}})
+    if not data.get('data'):
+        raise GraphQLError(f"Error fetching repository details: {data.get('errors')}")
+    return [parse_repository(node) for node in data['data']['nodes'] if node]
+
+def enrich_repositories(node_ids: list[str], store: ResultStore | None = None, workers: int = 2, batch_size: int = NODES_PER_QUERY) -> int:
+    """
+    Fetch details of many repositories in batches of node IDs and merge them into the store.
+
+    :param node_ids: GraphQL node IDs.
+    :param store: Repository store (default is default_store()).
+    :param workers: Number of concurrent GraphQL requests.
+    :param batch_size: Node IDs per query (at most NODES_PER_QUERY).
+    :return: Number of repositories updated.
+    """
+    if store is None:
+        store = default_store()
+    node_ids = list(dict.fromkeys(node_ids))
+    batches = [node_ids[i:i + batch_size] for i in range(0, len(node_ids), batch_size)]
+
+    updated = 0
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for details in executor.map(fetch_repository_details, batches):
+            for record in details:
+                store.put_repository_details(record)
+            updated += len(details)
+    print(f"Enriched {updated} repositories with {len(batches)} GraphQL queries")
+    return updated
+
+def enrich_store(store: ResultStore | None = None, workers: int = 2, refresh: bool = False) -> int:
+    """
+    Fetch details for the stored repositories that do not have them yet.
+
+    :param store: Repository store (default is default_store()).
+    :param workers: Number of concurrent GraphQL requests.
+    :param refresh: Fetch details again for every stored repository.
+    :return: Number of repositories updated.
+    """
+    if store is None:
+        store = default_store()
+    return enrich_repositories(store.node_ids(missing_details=not refresh), store, workers)
@@ -0,0 +1,182 @@
+import json
+import os
+import threading
+from typing import Iterable
+from urllib.parse import quote
+
+# 収集・分析の対象とする既定の言語 (GitHub の language: 修飾子に渡す名前)
+# koudo languages で作った言語一覧 (<cache-dir>/languages.json) があればそちらを使う
+LANGS = [
+    'python',
+    'TypeScript',
+    'javascript',
+    'java',
+    'c++',
+    'c#',
+    'php',
+    'shell',
+    'C',
+    'go'
+]
+
+# GitHub linguist の言語定義 (名前・種類・色)
+LINGUIST_URL = 'https://raw.githubusercontent.com/github-linguist/linguist/main/lib/linguist/languages.yml'
+
+# 黄金比ずつ色相をずらすと，隣り合う言語の色が似ない
+_GOLDEN_RATIO = 0.618033988749895
+
+def search_qualifier(language: str) -> str:
+    """
+    URL-encoded language: qualifier of a search query (names with spaces are quoted).
+    """
+    name = f'"{language}"' if ' ' in language else language
+    return f"language:{quote(name, safe='')}"
+
+def parse_linguist(text: str) -> dict[str, dict[str, str]]:
+    """
+    Read the name, type and color of each language from linguist's languages.yml.
+    Only the top-level keys and their scalar fields are needed, so this reads the lines
+    directly instead of requiring a YAML parser.
+
+    :param text: Contents of languages.yml.
+    :return: Dict of language name to {'type': ..., 'color': ...}.
+    """
+    languages: dict[str, dict[str, str]] = {}
+    current = None
+    for line in text.splitlines():
+        if not line.strip() or line.lstrip().startswith('#') or line.startswith('---'):
+            continue
+        if not line[0].isspace() and line.rstrip().endswith(':'):
+            current = languages.setdefault(line.rstrip()[:-1].strip('"\''), {})
+        elif current is not None and line.startswith('  ') and not line.startswith('   '):
+            key, _, value = line.strip().partition(':')
+            if key in ('type', 'color') and value.strip():
+                current[key] = value.strip().strip('"\'')
+    return languages
+
+def _colormap_color(index: int) -> str:
+    from matplotlib import colormaps
+    from matplotlib.colors import to_hex
+
+    # 最初の 10 言語は tab10，次の 10 言語は tab20 の淡い色，それ以降は連続のカラーマップから取る
+    # (色は位置だけで決まるので，言語が増えても既存の言語の色は変わらない)
+    if index < 10:
+        return to_hex(colormaps['tab10'](index))
+    if index < 20:
+        return to_hex(colormaps['tab20'](2 * (index - 10) + 1))
+    return to_hex(colormaps['turbo']((index * _GOLDEN_RATIO) % 1.0))
+
+class LanguageRegistry:
+    """
+    Ordered set of languages with a stable plot color for each.
+    Colors come from the language's own color (e.g. linguist data) or from a colormap
+    by the language's position, so a language keeps its color whichever subset is plotted.
+    """
+
+    def __init__(self, names: Iterable[str] = LANGS, colors: dict[str, str] | None = None):
+        """
+        :param names: Languages in order (duplicates are ignored).
+        :param colors: Explicit colors of some languages.
+        """
+        self._names = list(dict.fromkeys(names))
+        self._colors = dict(colors or {})
+        self._lock = threading.Lock()
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._names
+
+    def __iter__(self):
+        return iter(list(self._names))
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    @property
+    def names(self) -> list[str]:
+        return list(self._names)
+
+    def add(self, name: str, color: str | None = None) -> None:
+        with self._lock:
+            if name not in self._names:
+                self._names.append(name)
+            if color:
+                self._colors[name] = color
+
+    def color(self, name: str) -> str:
+        """
+        Plot color of a language (languages not in the registry are added).
+        """
+        if name not in self._names:
+            self.add(name)
+        if name in self._colors:
+            return self._colors[name]
+        return _colormap_color(self._names.index(name))
+
+    def colors(self, names: list[str]) -> list[str]:
+        for name in names:
+            if name not in self._names:
+                self.add(name)
+        return [self.color(name) for name in names]
+
+    def save(self, path: str) -> str:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'languages': self._names, 'colors': self._colors}, f, ensure_ascii=False, indent=2)
+        return path
+
+    @classmethod
+    def load(cls, path: str) -> 'LanguageRegistry':
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(data['languages'], data.get('colors'))
+
+    @classmethod
+    def from_linguist(cls, types: tuple[str, ...] = ('programming',), url: str = LINGUIST_URL) -> 'LanguageRegistry':
+        """
+        Every language of the given linguist types, with linguist's colors.
+
+        :param types: Linguist language types ('programming', 'markup', 'data', 'prose').
+        :param url: URL of linguist's languages.yml.
+        :return: LanguageRegistry in alphabetical order.
+        """
+        import requests
+
+        response = requests.get(url, timeout=30)
+        response.raise_for_status()
+        data = parse_linguist(response.text)
+        names = sorted((name for name, info in data.items() if info.get('type') in types), key=str.lower)
+        return cls(names, {name: data[name]['color'] for name in names if data[name].get('color')})
+
+    @classmethod
+    def from_store(cls, store, min_repositories: int = 1) -> 'LanguageRegistry':
+        """
+        Languages of the repositories collected so far, most common first.
+
+        :param store: ResultStore holding the repositories table.
+        :param min_repositories: Minimum number of repositories of a language.
+        :return: LanguageRegistry.
+        """
+        frame = store.repositories()
+        counts = frame['language'].dropna().value_counts()
+        return cls(counts[counts >= min_repositories].index.tolist())
+
+_default_registry: LanguageRegistry | None = None
+
+def default_registry() -> LanguageRegistry:
+    """
+    Registry used for plot colors (LANGS unless set_default_registry was called).
+    """
+    global _default_registry
+    if _default_registry is None:
+        _default_registry = LanguageRegistry(LANGS)
+    return _default_registry
+
+def set_default_registry(registry: LanguageRegistry) -> None:
+    global _default_registry
+    _default_registry = registry
+
+def colors_for(langs: list[str]) -> list[str]:
+    """
+    Return the plot color of each language from the default registry.
+    """
+    return default_registry().colors(langs)
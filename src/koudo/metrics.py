@@ -0,0 +1,226 @@
+import atexit
+import sys
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Iterable
+
+# Prometheus のテキスト形式 (version 0.0.4) で出力するメトリクス
+# 値は常に集計しておき (ロック 1 回分の負荷)，公開するかどうかは koudo の --metrics-port / --metrics-dump で決める
+
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+def _format_labels(names: tuple[str, ...], values: tuple) -> str:
+    if not names:
+        return ''
+    pairs = ','.join(f'{n}="{_escape(str(v))}"' for n, v in zip(names, values))
+    return f'{{{pairs}}}'
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+class _Metric:
+    type = ''
+
+    def __init__(self, name: str, help: str, labels: Iterable[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(labels[n] for n in self.labels)
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def sum(self, **labels) -> float:
+        """
+        Total over every label set matching the given labels.
+        """
+        positions = [(self.labels.index(n), v) for n, v in labels.items()]
+        with self._lock:
+            return sum(value for key, value in self._values.items() if all(key[i] == v for i, v in positions))
+
+    def samples(self) -> list[tuple[str, str, float]]:
+        with self._lock:
+            items = list(self._values.items())
+        return [(self.name, _format_labels(self.labels, key), value) for key, value in items]
+
+class Counter(_Metric):
+    type = 'counter'
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+class Gauge(_Metric):
+    type = 'gauge'
+
+    def set(self, value: float, **labels) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+class Histogram(_Metric):
+    type = 'histogram'
+
+    def __init__(self, name: str, help: str, labels: Iterable[str] = (), buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+        self._counts: dict[tuple, list[int]] = {}
+        self._sums: dict[tuple, float] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._counts.setdefault(key, [0] * (len(self.buckets) + 1))
+            counts[index] += 1
+            self._sums[key] = self._sums.get(key, 0.0) + value
+
+    def count(self, **labels) -> int:
+        with self._lock:
+            return sum(self._counts.get(self._key(labels), ()))
+
+    def samples(self) -> list[tuple[str, str, float]]:
+        with self._lock:
+            items = [(key, list(counts), self._sums[key]) for key, counts in self._counts.items()]
+        names = self.labels + ('le',)
+        samples = []
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float('inf'),), counts):
+                cumulative += n
+                samples.append((f"{self.name}_bucket", _format_labels(names, key + (_format_value(bound),)), cumulative))
+            samples.append((f"{self.name}_sum", _format_labels(self.labels, key), total))
+            samples.append((f"{self.name}_count", _format_labels(self.labels, key), cumulative))
+        return samples
+
+class _Callback:
+    """
+    Metric whose samples are read from existing state when rendering.
+    """
+
+    def __init__(self, name: str, type: str, help: str, fn: Callable[[], Iterable[tuple[dict, float]]]):
+        self.name = name
+        self.type = type
+        self.help = help
+        self.fn = fn
+
+    def samples(self) -> list[tuple[str, str, float]]:
+        return [
+            (self.name, _format_labels(tuple(labels), tuple(labels.values())), value)
+            for labels, value in self.fn()
+        ]
+
+class Registry:
+    """
+    Named metrics rendered together in the Prometheus text format.
+    """
+
+    def __init__(self):
+        self._metrics: dict[str, object] = {}
+        self._lock = threading.Lock()
+        self.started = time.time()
+
+    def _register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric already registered: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labels: Iterable[str] = ()) -> Counter:
+        return self._register(Counter(name, help, labels))
+
+    def gauge(self, name: str, help: str, labels: Iterable[str] = ()) -> Gauge:
+        return self._register(Gauge(name, help, labels))
+
+    def histogram(self, name: str, help: str, labels: Iterable[str] = (), buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help, labels, buckets))
+
+    def callback(self, name: str, type: str, help: str, fn: Callable[[], Iterable[tuple[dict, float]]]) -> None:
+        """
+        Register a metric computed by fn() -> [(labels, value), ...] at render time.
+        """
+        self._register(_Callback(name, type, help, fn))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{labels} {_format_value(value)}")
+        return '\n'.join(lines) + '\n'
+
+registry = Registry()
+registry.callback('koudo_uptime_seconds', 'gauge', 'Seconds since the process started', lambda: [({}, time.time() - registry.started)])
+
+# GitHub API
+request_seconds = registry.histogram('koudo_github_request_seconds', 'Latency of GitHub API requests by endpoint family', ['family'])
+requests_total = registry.counter('koudo_github_requests_total', 'GitHub API responses by endpoint family and status', ['family', 'status'])
+rate_limit_remaining = registry.gauge('koudo_github_rate_limit_remaining', 'Remaining GitHub API quota per token and resource', ['token', 'resource'])
+
+# キャッシュ
+store_lookups = registry.counter('koudo_store_lookups_total', 'Result store lookups by metric and result (hit or miss)', ['metric', 'result'])
+
+# パイプライン
+pipeline_items = registry.counter('koudo_pipeline_items_total', 'Items processed by each pipeline stage', ['stage'])
+pipeline_busy_seconds = registry.counter('koudo_pipeline_busy_seconds_total', 'Seconds spent in each pipeline stage', ['stage'])
+pipeline_items_per_second = registry.gauge('koudo_pipeline_items_per_second', 'Items per second of each stage in the last pipeline run', ['stage'])
+
+class _Handler(BaseHTTPRequestHandler):
+    registry: Registry = registry
+
+    def do_GET(self) -> None:
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = self.registry.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+def serve_metrics(port: int, host: str = '127.0.0.1') -> ThreadingHTTPServer:
+    """
+    Serve /metrics in a background thread.
+
+    :param port: Local port.
+    :param host: Address to bind (default is local only).
+    :return: The running server (call shutdown() to stop it).
+    """
+    server = ThreadingHTTPServer((host, port), _Handler)
+    threading.Thread(target=server.serve_forever, name='metrics', daemon=True).start()
+    print(f"Serving metrics on http://{host}:{server.server_address[1]}/metrics")
+    return server
+
+def dump(path: str = '-') -> None:
+    """
+    Write the metrics to a file ('-' for stdout).
+    """
+    text = registry.render()
+    if path == '-':
+        sys.stdout.write(text)
+    else:
+        with open(path, 'w') as f:
+            f.write(text)
+
+def dump_at_exit(path: str = '-') -> None:
+    atexit.register(dump, path)
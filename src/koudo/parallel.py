@@ -0,0 +1,64 @@
+import functools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Iterable
+
+from .profiling import tracer
+
+def default_workers() -> int:
+    """
+    Number of worker processes: KOUDO_WORKERS if set, otherwise the number of CPUs.
+    """
+    return int(os.getenv('KOUDO_WORKERS', 0)) or os.cpu_count() or 1
+
+def _call(fn: Callable, trace: bool, args: tuple) -> tuple[Any, tuple | None]:
+    if not trace:
+        return fn(*args), None
+    # ワーカーの span は結果と一緒に返し，親プロセスの tracer にまとめる
+    # (fork で親の span を引き継いでいることがあるので，この呼び出しの分だけを返す)
+    tracer.enable()
+    first = len(tracer.spans)
+    result = fn(*args)
+    origin, spans = tracer.spans_since(first)
+    return result, (origin, spans, os.getpid())
+
+def map_tasks(fn: Callable[..., Any], tasks: Iterable[tuple], workers: int | None = None) -> list[Any]:
+    """
+    Run fn(*task) for every task in a process pool (the pool behind every analysis stage).
+    Results keep the order of tasks whatever order the workers finish in.
+    When tracing is enabled, the spans recorded in the workers are merged into the tracer.
+
+    :param fn: Module-level function (it is pickled to the workers).
+    :param tasks: Argument tuples, one per call.
+    :param workers: Number of processes (default is default_workers(); 1 runs in this process).
+    :return: List of results, in the order of tasks.
+    """
+    if workers is None:
+        workers = default_workers()
+    tasks = list(tasks)
+
+    if workers <= 1 or len(tasks) <= 1:
+        return [fn(*task) for task in tasks]
+
+    call = functools.partial(_call, fn, tracer.enabled)
+    results = []
+    with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as executor:
+        for result, trace in executor.map(call, tasks):
+            if trace is not None:
+                tracer.merge(*trace)
+            results.append(result)
+    return results
+
+def map_languages(fn: Callable[..., Any], items: dict[str, Any], workers: int | None = None, **kwargs) -> dict[str, Any]:
+    """
+    Run fn(lang, item, **kwargs) for every language with map_tasks.
+
+    :param fn: Module-level function (it is pickled to the workers).
+    :param items: Dict of language to the per-language argument (e.g. its text or file path).
+    :param workers: Number of processes (default is default_workers(); 1 runs in this process).
+    :param kwargs: Arguments shared by every call.
+    :return: Dict of language to result, in the order of items.
+    """
+    tasks = list(items.items())
+    results = map_tasks(functools.partial(fn, **kwargs), tasks, workers)
+    return {key: result for (key, _), result in zip(tasks, results)}
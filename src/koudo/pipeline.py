@@ -0,0 +1,138 @@
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable
+
+from .metrics import pipeline_busy_seconds, pipeline_items, pipeline_items_per_second
+
+_DONE = object()
+
+@dataclass
+class Stage:
+    """
+    One step of a pipeline.
+
+    fn receives one item and returns the item for the next stage
+    (or an iterable of items when fan_out is True; None drops the item).
+    """
+    name: str
+    fn: Callable[[Any], Any]
+    workers: int = 1
+    fan_out: bool = False
+    queue_size: int = 16
+    processed: int = 0
+    emitted: int = 0
+    busy: float = 0.0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def _record(self, elapsed: float, emitted: int) -> None:
+        with self._lock:
+            self.processed += 1
+            self.emitted += emitted
+            self.busy += elapsed
+        pipeline_items.inc(stage=self.name)
+        pipeline_busy_seconds.inc(elapsed, stage=self.name)
+
+class Pipeline:
+    """
+    Stages connected by bounded queues. Each stage runs its own worker threads, and a full
+    queue blocks the stage in front of it, so a slow stage applies backpressure upstream.
+    """
+
+    def __init__(self, stages: list[Stage]):
+        self.stages = stages
+        self.elapsed = 0.0
+        self._queues = [queue.Queue(maxsize=s.queue_size) for s in stages]
+        self._output: list = []
+        self._error: BaseException | None = None
+
+    def _worker(self, index: int, finished: list, lock: threading.Lock) -> None:
+        stage = self.stages[index]
+        inbox = self._queues[index]
+        outbox = self._queues[index + 1] if index + 1 < len(self.stages) else None
+
+        while True:
+            item = inbox.get()
+            if item is _DONE:
+                break
+            if self._error is not None:
+                # エラー後は上流を詰まらせないよう読み捨てる
+                continue
+
+            start = time.perf_counter()
+            try:
+                result = stage.fn(item)
+                results = list(result) if stage.fan_out else ([] if result is None else [result])
+            except BaseException as e:
+                self._error = self._error or e
+                continue
+            stage._record(time.perf_counter() - start, len(results))
+
+            for r in results:
+                if outbox is None:
+                    with lock:
+                        self._output.append(r)
+                else:
+                    outbox.put(r)
+
+        with lock:
+            finished[index] += 1
+            last = finished[index] == stage.workers
+        if last and outbox is not None:
+            for _ in range(self.stages[index + 1].workers):
+                outbox.put(_DONE)
+
+    def run(self, inputs: Iterable) -> list:
+        """
+        Feed inputs through every stage and wait for the pipeline to drain.
+
+        :param inputs: Items for the first stage.
+        :return: Items emitted by the last stage (in completion order).
+        """
+        lock = threading.Lock()
+        finished = [0] * len(self.stages)
+        threads = [
+            threading.Thread(target=self._worker, args=(i, finished, lock), name=f"{stage.name}-{n}", daemon=True)
+            for i, stage in enumerate(self.stages)
+            for n in range(stage.workers)
+        ]
+
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        for item in inputs:
+            self._queues[0].put(item)
+        for _ in range(self.stages[0].workers):
+            self._queues[0].put(_DONE)
+        for t in threads:
+            t.join()
+        self.elapsed = time.perf_counter() - start
+        for stage in self.stages:
+            pipeline_items_per_second.set(stage.processed / self.elapsed if self.elapsed else 0.0, stage=stage.name)
+
+        if self._error is not None:
+            raise self._error
+        return self._output
+
+    def stats(self) -> list[dict]:
+        """
+        Per-stage throughput counters. A stage whose busy time per worker is close to
+        the total elapsed time is the bottleneck.
+        """
+        return [
+            {
+                'stage': s.name,
+                'workers': s.workers,
+                'processed': s.processed,
+                'emitted': s.emitted,
+                'items_per_sec': s.processed / self.elapsed if self.elapsed else 0.0,
+                'utilization': s.busy / (s.workers * self.elapsed) if self.elapsed else 0.0,
+            }
+            for s in self.stages
+        ]
+
+    def print_stats(self) -> None:
+        print(f"{'stage':12} {'workers':>7} {'processed':>9} {'items/s':>8} {'util':>6}")
+        for s in self.stats():
+            print(f"{s['stage']:12} {s['workers']:>7} {s['processed']:>9} {s['items_per_sec']:>8.2f} {s['utilization']:>6.1%}")
@@ -0,0 +1,96 @@
+import os
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+from matplotlib import colormaps
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.colors import to_rgba
+from matplotlib.figure import Figure
+from matplotlib.lines import Line2D
+
+from .profiling import tracer
+
+# pyplot を使わずに Figure と Agg のキャンバスで描画する
+# (プロセス全体のバックエンドを切り替えず，pyplot の図の登録簿にも残らないので閉じる必要がない)
+_reusable_figures: dict[tuple[float, float], Figure] = {}
+
+def _new_figure(figsize: tuple[float, float]) -> Figure:
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    return fig
+
+@contextmanager
+def figure(figsize: tuple[float, float] = (10, 6), reuse: bool = False):
+    """
+    Create a figure that is released when the block exits.
+
+    :param figsize: Size of the figure in inches.
+    :param reuse: If True, reuse one cleared figure per figsize instead of allocating a new one.
+    :return: Context manager yielding the matplotlib Figure.
+    """
+    if reuse:
+        fig = _reusable_figures.get(figsize)
+        if fig is None:
+            fig = _new_figure(figsize)
+            _reusable_figures[figsize] = fig
+        try:
+            yield fig
+        finally:
+            fig.clf()
+    else:
+        fig = _new_figure(figsize)
+        try:
+            yield fig
+        finally:
+            fig.clf()
+
+def save_figure(fig: Figure, path: str, **kwargs) -> str:
+    """
+    Save a figure to a file.
+
+    :param fig: The figure to save.
+    :param path: Output file path.
+    :return: The output file path.
+    """
+    # PNG などへのエンコードの時間も計測する
+    with tracer.span('save_figure', items=1) as span:
+        fig.savefig(path, **kwargs)
+        span.bytes = os.path.getsize(path)
+    return path
+
+def close_all() -> None:
+    """
+    Release the reusable figures.
+    """
+    _reusable_figures.clear()
+
+def scatter_by_category(ax, frame, x: str, y: str, category: str = 'language', order: list | None = None, colors: list | None = None, **kwargs):
+    """
+    Draw every row of a frame with one scatter call, colored by a categorical column.
+
+    :param ax: The axes to draw on.
+    :param frame: pandas DataFrame holding the x, y and category columns.
+    :param x: Column name for the x axis.
+    :param y: Column name for the y axis.
+    :param category: Column name used for coloring and the legend.
+    :param order: Category order (default is order of first appearance).
+    :param colors: Colors matched to order (default is the tab10/tab20 colormap).
+    :return: The PathCollection returned by ax.scatter.
+    """
+    if order is None:
+        order = list(pd.unique(frame[category]))
+    if colors is None:
+        cmap = colormaps['tab10' if len(order) <= 10 else 'tab20']
+        colors = [cmap(i % cmap.N) for i in range(len(order))]
+
+    codes = pd.Categorical(frame[category], categories=order).codes
+    palette = np.array([to_rgba(c) for c in colors] + [(0, 0, 0, 0)])
+    collection = ax.scatter(frame[x].to_numpy(), frame[y].to_numpy(), c=palette[codes], **kwargs)
+
+    handles = [
+        Line2D([], [], marker='o', linestyle='', color=colors[i], label=label)
+        for i, label in enumerate(order)
+    ]
+    ax.legend(handles=handles, loc='upper right')
+    return collection
@@ -0,0 +1,219 @@
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+# 計測は既定で無効 (span は何も記録しない)．koudo の --trace / --profile で有効にする
+
+@dataclass
+class Span:
+    name: str
+    start: int = 0
+    duration: int = 0
+    bytes: int = 0
+    items: int = 0
+    tid: int = 0
+    pid: int = 0
+    args: dict = field(default_factory=dict)
+
+class _NullSpan:
+    # 無効なときに返す，値を捨てるだけの span
+    bytes = 0
+    items = 0
+
+    def __setattr__(self, name, value) -> None:
+        pass
+
+_NULL_SPAN = _NullSpan()
+
+class Tracer:
+    """
+    Collects timing spans with the bytes and items each one processed.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.spans: list[Span] = []
+        self._origin = time.perf_counter_ns()
+        self._lock = threading.Lock()
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def clear(self) -> None:
+        with self._lock:
+            self.spans = []
+
+    def spans_since(self, first: int) -> tuple[int, list[Span]]:
+        """
+        Spans recorded after the first `first` ones, with this tracer's origin (see merge).
+        """
+        with self._lock:
+            return self._origin, self.spans[first:]
+
+    def merge(self, origin: int, spans: list[Span], pid: int) -> None:
+        """
+        Add spans recorded by another process (e.g. a pool worker) to this tracer.
+        perf_counter_ns is a system-wide monotonic clock, so the spans only have to be
+        shifted by the difference of the two tracers' origins.
+
+        :param origin: The other tracer's origin.
+        :param spans: Its spans.
+        :param pid: Process ID shown for the spans in the trace.
+        """
+        shift = origin - self._origin
+        with self._lock:
+            for span in spans:
+                span.start += shift
+                span.pid = pid
+                self.spans.append(span)
+
+    @contextmanager
+    def span(self, name: str, bytes: int = 0, items: int = 0, **args):
+        """
+        Time the body of a with statement; bytes and items can also be set on the yielded span.
+
+        :param name: Span name (shown as the event name in the trace).
+        :param bytes: Bytes processed.
+        :param items: Items processed.
+        :param args: Extra values stored with the span.
+        """
+        if not self.enabled:
+            yield _NULL_SPAN
+            return
+        span = Span(name, bytes=bytes, items=items, tid=threading.get_ident(), args=args)
+        start = time.perf_counter_ns()
+        try:
+            yield span
+        finally:
+            span.start = start - self._origin
+            span.duration = time.perf_counter_ns() - start
+            with self._lock:
+                self.spans.append(span)
+
+    def chrome_trace(self) -> dict:
+        """
+        Spans as Chrome trace events (open with chrome://tracing or Perfetto).
+        """
+        pid = os.getpid()
+        events = [
+            {
+                'name': s.name,
+                'ph': 'X',
+                'ts': s.start / 1000,
+                'dur': s.duration / 1000,
+                'pid': s.pid or pid,
+                'tid': s.tid,
+                'args': {'bytes': s.bytes, 'items': s.items, **s.args},
+            }
+            for s in self.spans
+        ]
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def export_chrome_trace(self, path: str) -> str:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(self.chrome_trace(), f, default=str)
+        return path
+
+    def summary(self) -> list[dict]:
+        """
+        Totals per span name, slowest first.
+        """
+        totals: dict[str, dict] = {}
+        for s in self.spans:
+            row = totals.setdefault(s.name, {'name': s.name, 'count': 0, 'seconds': 0.0, 'bytes': 0, 'items': 0})
+            row['count'] += 1
+            row['seconds'] += s.duration / 1e9
+            row['bytes'] += s.bytes
+            row['items'] += s.items
+        return sorted(totals.values(), key=lambda row: row['seconds'], reverse=True)
+
+    def print_summary(self) -> None:
+        print(f"{'span':24} {'count':>7} {'total s':>9} {'mean ms':>9} {'MB':>9} {'items':>9} {'MB/s':>8}")
+        for row in self.summary():
+            mb = row['bytes'] / 1e6
+            mean = row['seconds'] / row['count'] * 1000
+            rate = mb / row['seconds'] if row['seconds'] else 0.0
+            print(f"{row['name']:24} {row['count']:7} {row['seconds']:9.3f} {mean:9.2f} {mb:9.2f} {row['items']:9} {rate:8.2f}")
+
+tracer = Tracer()
+
+def traced(name: str, size: Callable[..., int] | None = None, count: Callable[[Any], int] | None = None):
+    """
+    Decorator that records each call of a function as a span of the module tracer.
+
+    :param name: Span name.
+    :param size: Function of the call arguments giving the bytes processed.
+    :param count: Function of the return value giving the items processed.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return fn(*args, **kwargs)
+            with tracer.span(name) as span:
+                if size is not None:
+                    span.bytes = size(*args, **kwargs)
+                result = fn(*args, **kwargs)
+                if count is not None:
+                    span.items = count(result)
+                return result
+        return wrapper
+    return decorator
+
+def text_size(texts, *args, **kwargs) -> int:
+    """
+    Bytes of a text or of the values of a dict of texts, the first argument of the
+    analysis functions (other arguments are ignored).
+    """
+    if isinstance(texts, str):
+        return len(texts.encode('utf-8'))
+    return sum(len(t.encode('utf-8')) for t in texts.values())
+
+@contextmanager
+def profile(mode: str | None, path: str = 'profile', top: int = 20):
+    """
+    Optional deeper profiling of the body of a with statement.
+
+    :param mode: 'cprofile' (function timings, saved to {path}.prof) or 'tracemalloc'
+        (allocation sites and peak memory), or None to do nothing.
+    :param path: Output path prefix for cProfile stats.
+    :param top: Number of rows to print.
+    """
+    if mode is None:
+        yield
+        return
+
+    if mode == 'cprofile':
+        import cProfile
+        import pstats
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            profiler.dump_stats(f"{path}.prof")
+            pstats.Stats(profiler).sort_stats('cumulative').print_stats(top)
+    elif mode == 'tracemalloc':
+        import tracemalloc
+
+        tracemalloc.start()
+        try:
+            yield
+        finally:
+            snapshot = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"Peak traced memory: {peak / 1e6:.1f} MB")
+            for stat in snapshot.statistics('lineno')[:top]:
+                print(stat)
+    else:
+        raise ValueError(f"Unknown profile mode: {mode}")
@@ -0,0 +1,54 @@
+import threading
+import time
+from typing import Callable
+
+from .credentials import default_token_pool
+from .profiling import tracer
+
+# GitHub search API の上限 (トークン 1 つあたり・認証なし)
+SEARCH_REQUESTS_PER_MINUTE = 30
+ANONYMOUS_SEARCH_REQUESTS_PER_MINUTE = 10
+
+class RateLimiter:
+    """
+    Thread-safe limiter that spaces calls evenly to stay within a request budget.
+    """
+
+    def __init__(self, rate: int | Callable[[], int], per: float = 60.0):
+        """
+        :param rate: Number of calls allowed per period, or a function returning it
+            (read on every call, so the budget can follow e.g. the number of usable tokens).
+        :param per: Length of the period in seconds.
+        """
+        self.rate = rate
+        self.per = per
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    @property
+    def interval(self) -> float:
+        rate = self.rate() if callable(self.rate) else self.rate
+        return self.per / max(rate, 1)
+
+    def acquire(self) -> None:
+        """
+        Block until the next call is allowed.
+        """
+        interval = self.interval
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next - now
+            self._next = max(now, self._next) + interval
+        if wait > 0:
+            with tracer.span('ratelimit.sleep'):
+                time.sleep(wait)
+
+def search_rate() -> int:
+    """
+    Search requests per minute allowed to the usable tokens of the default pool together
+    (search quota is counted per token).
+    """
+    tokens = default_token_pool().available()
+    return SEARCH_REQUESTS_PER_MINUTE * tokens if tokens else ANONYMOUS_SEARCH_REQUESTS_PER_MINUTE
+
+search_limiter = RateLimiter(search_rate)
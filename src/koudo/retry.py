@@ -0,0 +1,162 @@
+import random
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Callable
+
+import requests
+
+from .metrics import registry
+from .profiling import tracer
+
+class HTTPStatusError(Exception):
+    """
+    Raised when a request finally fails with a non-200 response.
+    """
+
+    def __init__(self, message: str, status_code: int):
+        super().__init__(message)
+        self.status_code = status_code
+
+# リトライ回数の集計 (理由ごと)
+retry_metrics: Counter = Counter()
+_metrics_lock = threading.Lock()
+
+registry.callback(
+    'koudo_retries_total', 'counter', 'Retried requests by reason (status code, connection or gave_up)',
+    lambda: [({'reason': reason}, n) for reason, n in list(retry_metrics.items())],
+)
+
+def _count(reason: str) -> None:
+    with _metrics_lock:
+        retry_metrics[reason] += 1
+
+# GitHub の secondary rate limit (短時間の大量リクエストや同時実行数の制限) の応答に含まれる文言
+_SECONDARY_RATE_LIMIT_MESSAGES = ('secondary rate limit', 'abuse detection')
+
+def is_secondary_rate_limit(response: requests.Response) -> bool:
+    """
+    Whether a 403/429 response is GitHub's secondary rate limit.
+    These do not always carry Retry-After and leave X-RateLimit-Remaining above zero,
+    so they are recognized by the message in the body.
+    """
+    if response.status_code not in (403, 429):
+        return False
+    try:
+        message = response.text.lower()
+    except (AttributeError, UnicodeDecodeError):
+        return False
+    return any(m in message for m in _SECONDARY_RATE_LIMIT_MESSAGES)
+
+@dataclass
+class RetryPolicy:
+    """
+    Per-status retry rules: 5xx and connection errors back off with jitter (at most
+    max_delay, max_retries times), 403/429 rate limits sleep for the whole Retry-After
+    (or until the reset time), secondary rate limits without Retry-After wait at least
+    secondary_delay, and everything else fails immediately.
+    Rate-limit waits do not count against max_retries, since the request is expected to
+    succeed once the limit is lifted; max_rate_limit_waits only guards against endless waiting.
+    """
+    max_retries: int = 5
+    base_delay: float = 1.0
+    max_delay: float = 120.0
+    secondary_delay: float = 60.0
+    max_rate_limit_waits: int = 20
+    retry_statuses: tuple[int, ...] = (500, 502, 503, 504)
+    rate_limit_statuses: tuple[int, ...] = (403, 429)
+
+    def backoff(self, attempt: int) -> float:
+        """
+        Exponential backoff with full jitter.
+        """
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def rate_limit_delay(self, waits: int, response: requests.Response) -> float | None:
+        """
+        Seconds GitHub asks to wait before retrying a rate-limited response (never shortened,
+        since retrying early can get the token or integration banned).
+
+        :param waits: Number of rate-limit waits already made for this request.
+        :param response: The failed response.
+        :return: Seconds to wait, or None if the response is not a rate limit.
+        """
+        if response.status_code not in self.rate_limit_statuses:
+            return None
+        headers = response.headers
+        if 'Retry-After' in headers:
+            return float(headers['Retry-After']) + random.uniform(0, 1)
+        if headers.get('X-RateLimit-Remaining') == '0' and 'X-RateLimit-Reset' in headers:
+            return max(0.0, float(headers['X-RateLimit-Reset']) - time.time()) + random.uniform(0, 1)
+        if is_secondary_rate_limit(response):
+            # GitHub のドキュメントでは Retry-After がなければ少なくとも 1 分待ち，続けば待ちを延ばす
+            return self.secondary_delay * 2 ** min(waits, 4) + random.uniform(0, 1)
+        return None
+
+    def delay(self, attempt: int, response: requests.Response) -> float | None:
+        """
+        Decide how long to wait before retrying a response.
+
+        :param attempt: Number of retries already made.
+        :param response: The failed response.
+        :return: Seconds to wait, or None if the response must not be retried.
+        """
+        status = response.status_code
+        if status in self.retry_statuses:
+            return self.backoff(attempt)
+
+        wait = self.rate_limit_delay(attempt, response)
+        if wait is not None:
+            return wait
+        if status == 429:
+            return self.backoff(attempt)
+        # レート制限以外の 403 (権限不足など) はリトライしない
+        return None
+
+default_policy = RetryPolicy()
+
+def request_with_retry(send: Callable[[], requests.Response], policy: RetryPolicy = default_policy) -> requests.Response:
+    """
+    Call send until it returns a response that should not be retried.
+
+    :param send: Function performing one request.
+    :param policy: Retry rules.
+    :return: The last response (check its status code).
+    """
+    attempt = 0
+    rate_limit_waits = 0
+    while True:
+        try:
+            response = send()
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt >= policy.max_retries:
+                _count('gave_up')
+                raise
+            _count('connection')
+            with tracer.span('retry.sleep', reason='connection'):
+                time.sleep(policy.backoff(attempt))
+            attempt += 1
+            continue
+
+        if response.status_code == 200:
+            return response
+
+        wait = policy.rate_limit_delay(rate_limit_waits, response)
+        if wait is not None:
+            if rate_limit_waits >= policy.max_rate_limit_waits:
+                _count('gave_up')
+                return response
+            rate_limit_waits += 1
+        else:
+            wait = policy.delay(attempt, response)
+            if wait is None:
+                return response
+            if attempt >= policy.max_retries:
+                _count('gave_up')
+                return response
+            attempt += 1
+
+        _count(str(response.status_code))
+        with tracer.span('retry.sleep', reason=str(response.status_code)):
+            time.sleep(wait)
@@ -0,0 +1,802 @@
+import requests
+import os
+import re
+import time
+from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING
+from .store import ResultStore, default_store
+from .ratelimit import search_limiter
+from .credentials import TokenPool, default_token_pool, resource_for_url
+from .singleflight import SingleFlight
+from .pipeline import Pipeline, Stage
+from .languages import colors_for, search_qualifier
+from .retry import HTTPStatusError, RetryPolicy, default_policy, is_secondary_rate_limit, request_with_retry, retry_metrics
+from .profiling import traced, tracer
+from .metrics import registry, request_seconds, requests_total, store_lookups
+
+# numpy / pandas / matplotlib は使う関数の中で import する (ratelimit などの起動を軽くするため)
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+
+def fetch_data(url: str, policy: RetryPolicy = default_policy) -> dict:
+    """
+    Fetch data from a given URL.
+
+    :param url: The URL to fetch data from.
+    :param policy: Retry rules for failed requests.
+    :return: JSON response from the URL.
+    """
+    response = request_with_retry(lambda: requests.get(url), policy)
+
+    if response.status_code != 200:
+        raise HTTPStatusError(f"Error fetching data: {response.status_code} - {response.text}", response.status_code)
+
+    return response.json()
+
+def endpoint_family(url: str) -> str:
+    """
+    Group of an API URL for metrics, e.g. 'search/issues', 'repos/commits' or 'rate_limit'
+    (owner and repository names are dropped).
+    """
+    parts = [p for p in urlparse(url).path.split('/') if p]
+    if not parts:
+        return 'root'
+    if parts[0] == 'repos':
+        return '/'.join(['repos'] + parts[3:4])
+    return '/'.join(parts[:2])
+
+@traced('fetch_data_from_github', count=lambda result: 1)
+def fetch_data_from_github(url: str, github_token: str | None = None, pool: TokenPool | None = None, policy: RetryPolicy = default_policy, payload: dict | None = None) -> tuple[dict, dict]:
+    """
+    Fetch data from a GitHub API endpoint using a personal access token.
+    Unless a token is given, the token with the most remaining quota is taken from the pool,
+    and a request rejected with 401 or a rate limit is retried with another token.
+    Requests are sent without a token only when the pool is empty.
+    Transient errors and rate limits are retried according to the policy.
+
+    :param url: The GitHub API endpoint URL.
+    :param github_token: Personal access token for GitHub API authentication (default is taken from the pool).
+    :param pool: Token pool to take tokens from (default is default_token_pool()).
+    :param policy: Retry rules for failed requests.
+    :param payload: JSON body to POST instead of a GET (e.g. a GraphQL query).
+    :return: JSON response from the GitHub API.
+    :raises NoUsableTokenError: If the pool has tokens but all of them were rejected.
+    """
+    if pool is None:
+        pool = default_token_pool()
+    resource = resource_for_url(url)
+    family = endpoint_family(url)
+
+    def send() -> requests.Response:
+        for _ in range(max(len(pool), 1)):
+            current_token = github_token if github_token is not None else pool.acquire(resource)
+
+            if current_token is not None:
+                headers = {
+                    'Authorization': f'token {current_token}',
+                    'Accept': 'application/vnd.github.v3+json'
+                }
+            else:
+                headers = {
+                    'Accept': 'application/vnd.github.v3+json'
+                }
+
+            with tracer.span('github.request', items=1, resource=resource) as span:
+                start = time.perf_counter()
+                if payload is None:
+                    response = requests.get(url, headers=headers)
+                else:
+                    response = requests.post(url, headers=headers, json=payload)
+                request_seconds.observe(time.perf_counter() - start, family=family)
+                requests_total.inc(family=family, status=response.status_code)
+                span.bytes = len(response.content)
+
+            secondary = is_secondary_rate_limit(response)
+            if current_token is not None:
+                pool.update(current_token, response.headers, response.status_code, resource, secondary)
+
+            # 別のトークンで送り直すのは，トークンが無効か使い切ったときだけ
+            # (権限不足などの 403 はどのトークンでも同じ結果になり，上限を無駄に使う)
+            rate_limited = response.status_code in (403, 429) and (
+                secondary or 'Retry-After' in response.headers or response.headers.get('X-RateLimit-Remaining') == '0'
+            )
+            if (response.status_code == 401 or rate_limited) and github_token is None and pool.available() > 0:
+                continue
+            break
+        return response
+
+    response = request_with_retry(send, policy)
+
+    if response.status_code != 200:
+        raise HTTPStatusError(f"Error fetching data from GitHub: {response.status_code} - {response.text}", response.status_code)
+
+    return dict(response.headers), response.json()
+
+# 同じ URL への同時リクエストをまとめ，結果を実行中は覚えておく
+github_requests = SingleFlight()
+
+def _hit_ratios() -> list[tuple[dict, float]]:
+    store_hits = store_lookups.sum(result='hit')
+    store_total = store_lookups.sum()
+    flights = github_requests.hits + github_requests.misses
+    return [
+        ({'cache': 'singleflight'}, github_requests.hits / flights if flights else 0.0),
+        ({'cache': 'store'}, store_hits / store_total if store_total else 0.0),
+    ]
+
+registry.callback(
+    'koudo_singleflight_requests_total', 'counter', 'Requests through the single-flight group by result (hit or miss)',
+    lambda: [({'result': 'hit'}, github_requests.hits), ({'result': 'miss'}, github_requests.misses)],
+)
+registry.callback('koudo_cache_hit_ratio', 'gauge', 'Hit ratio of the single-flight group and the result store', _hit_ratios)
+
+def fetch_data_from_github_once(url: str) -> tuple[dict, dict]:
+    """
+    Fetch data from a GitHub API endpoint, sharing one request among identical concurrent
+    calls and reusing the result for the rest of the run.
+
+    :param url: The GitHub API endpoint URL.
+    :return: JSON response from the GitHub API.
+    """
+    return github_requests.do(url, lambda: fetch_data_from_github(url))
+
+def after_days(date: str = "2024-04-01", delta_days: int = 60) -> str:
+    dt = datetime.strptime(date, "%Y-%m-%dT%H:%M:%SZ")
+    after_days = dt + timedelta(days=delta_days)
+    return str(after_days.strftime("%Y-%m-%d")) # 2024-05-31
+
+def get_top_repositories(language: str, sort: str = 'stars', order: str = 'desc', per_page: int = 100, pagination: int = 0) -> list:
+    """
+    Get top repositories for a given programming language from GitHub.
+
+    :param language: The programming language to filter repositories by.
+    :param sort: The sorting criteria (default is 'stars').
+    :param order: The order of sorting (default is 'desc').
+    :param per_page: Number of repositories to return per page (default is 100).
+    :return: List of top repositories.
+    """
+    if pagination == 0:
+        url = f"https://api.github.com/search/repositories?q={search_qualifier(language)}&sort={sort}&order={order}&per_page={per_page}"
+        _, data = fetch_data_from_github(url)
+    else:
+        url = f"https://api.github.com/search/repositories?q={search_qualifier(language)}&sort={sort}&order={order}&per_page={per_page}&page={pagination}"
+        _, data = fetch_data_from_github(url)
+
+    if not data or 'items' not in data:
+        raise Exception("No items found in the response.")
+
+    return data['items']
+
+def _search_total_count(url: str) -> int:
+    def fetch() -> tuple[dict, dict]:
+        # search API は 30 リクエスト/分 なので，API を呼ぶときだけ間隔を空ける
+        search_limiter.acquire()
+        return fetch_data_from_github(url)
+
+    _, raw = github_requests.do(url, fetch)
+    return int(raw['total_count'])
+
+def _stored_count(metric: str, owner: str, repo: str, start_date: str, end_date: str, fetch_count, store: ResultStore | None) -> int:
+    """
+    Return a count from the result store, calling fetch_count and storing the result on a miss.
+    """
+    if store is None:
+        store = default_store()
+
+    count = store.get(owner, repo, start_date, end_date, metric)
+    store_lookups.inc(metric=metric, result='hit' if count is not None else 'miss')
+    if count is not None:
+        return count
+
+    count = fetch_count()
+    store.put(owner, repo, start_date, end_date, metric, count)
+    return count
+
+def get_prs_counts_between_dates(owner: str, repo: str, start_date: str, end_date: str, store: ResultStore | None = None) -> int:
+    """
+    Get pull requests for a given repository between two dates.
+
+    :param owner: The owner of the repository.
+    :param repo: The name of the repository.
+    :param start_date: Start date in ISO format (YYYY-MM-DD).
+    :param end_date: End date in ISO format (YYYY-MM-DD).
+    :param store: Result store checked before calling the API (default is default_store()).
+    :return: count of pull requests.
+    """
+    url = (
+        f"https://api.github.com/search/issues"
+        f"?q=repo:{owner}/{repo}+is:pr+created:{start_date}..{end_date}"
+        f"&per_page=100"
+    )
+    return _stored_count('prs', owner, repo, start_date, end_date, lambda: _search_total_count(url), store)
+
+def get_issues_counts_between_dates(owner: str, repo: str, start_date: str, end_date: str, store: ResultStore | None = None) -> int:
+    """
+    Get issues for a given repository between two dates.
+
+    :param owner: The owner of the repository.
+    :param repo: The name of the repository.
+    :param start_date: Start date in ISO format (YYYY-MM-DD).
+    :param end_date: End date in ISO format (YYYY-MM-DD).
+    :param store: Result store checked before calling the API (default is default_store()).
+    :return: count of issues.
+    """
+
+    url = (
+        f"https://api.github.com/search/issues"
+        f"?q=repo:{owner}/{repo}+is:issue+created:{start_date}..{end_date}"
+        f"&per_page=100"
+    )
+
+    return _stored_count('issues', owner, repo, start_date, end_date, lambda: _search_total_count(url), store)
+
+def get_commits_counts_between_dates(owner: str, repo: str, start_date: str, end_date: str, store: ResultStore | None = None) -> int:
+    """
+    Get commits for a given repository between two dates.
+    Uses the commits listing with per_page=1 (core quota, one request) instead of search/commits.
+
+    :param owner: The owner of the repository.
+    :param repo: The name of the repository.
+    :param start_date: Start date in ISO format (YYYY-MM-DD).
+    :param end_date: End date in ISO format (YYYY-MM-DD).
+    :param store: Result store checked before calling the API (default is default_store()).
+    :return: count of commits.
+    """
+
+    since = start_date if 'T' in start_date else f"{start_date}T00:00:00Z"
+    until = end_date if 'T' in end_date else f"{end_date}T23:59:59Z"
+    url = f"https://api.github.com/repos/{owner}/{repo}/commits?since={since}&until={until}"
+
+    return _stored_count('commits', owner, repo, start_date, end_date, lambda: count_from_link(url), store)
+
+def make_windows(start_date: str, end_date: str, freq: str = 'monthly') -> 'np.ndarray':
+    """
+    Build window edges between two dates.
+    The windows cover [start_date, the day after end_date), so the whole end day is
+    counted whatever the frequency; the first and last windows may be shorter than a step
+    (monthly windows follow calendar months, so a window starts on the 1st except the first).
+
+    :param start_date: Start date (YYYY-MM-DD or YYYY-MM-DDTHH:MM:SSZ).
+    :param end_date: Last day included (YYYY-MM-DD or YYYY-MM-DDTHH:MM:SSZ).
+    :param freq: 'daily', 'weekly' or 'monthly' (calendar months).
+    :return: datetime64[s] array of edges; window i is [edges[i], edges[i+1]).
+    """
+    import numpy as np
+
+    start = np.datetime64(start_date.rstrip('Z'), 's')
+    stop = (np.datetime64(end_date.rstrip('Z'), 's').astype('datetime64[D]') + np.timedelta64(1, 'D')).astype('datetime64[s]')
+    if stop <= start:
+        raise ValueError(f"End date {end_date} is before start date {start_date}")
+
+    if freq == 'daily':
+        edges = np.arange(start, stop, np.timedelta64(1, 'D'))
+    elif freq == 'weekly':
+        edges = np.arange(start, stop, np.timedelta64(7, 'D'))
+    elif freq == 'monthly':
+        month = np.timedelta64(1, 'M')
+        months = np.arange(start.astype('datetime64[M]') + month, stop.astype('datetime64[M]') + month).astype('datetime64[s]')
+        edges = np.concatenate([[start], months[months < stop]])
+    else:
+        raise ValueError(f"Unknown window frequency: {freq}")
+
+    return np.append(edges, stop)
+
+def _next_link(headers: dict) -> str | None:
+    link_header = headers.get('Link') or headers.get('link')
+    if not link_header:
+        return None
+    match = re.search(r'<([^>]+)>;\s*rel="next"', link_header)
+    return match.group(1) if match else None
+
+def get_created_counts_by_window(owner: str, repo: str, edges: 'np.ndarray') -> 'dict[str, np.ndarray]':
+    """
+    Count pull requests and issues created in each window with one paginated fetch.
+    The issues list (which also contains pull requests) is paged in created order and
+    paging stops as soon as the last window has been passed.
+
+    :param owner: The owner of the repository.
+    :param repo: The name of the repository.
+    :param edges: Window edges from make_windows (or any sorted datetime64 array).
+    :return: {'prs': counts, 'issues': counts}, each an int array of len(edges) - 1.
+    """
+    import numpy as np
+
+    edges = np.asarray(edges, dtype='datetime64[s]')
+    url = (
+        f"https://api.github.com/repos/{owner}/{repo}/issues"
+        f"?state=all&sort=created&direction=asc&per_page=100"
+    )
+
+    created = []
+    is_pr = []
+    while url is not None:
+        headers, items = fetch_data_from_github(url)
+        if not items:
+            break
+        for item in items:
+            created.append(item['created_at'].rstrip('Z'))
+            is_pr.append('pull_request' in item)
+        if np.datetime64(items[-1]['created_at'].rstrip('Z'), 's') >= edges[-1]:
+            break
+        url = _next_link(headers)
+
+    n_windows = len(edges) - 1
+    if not created:
+        return {'prs': np.zeros(n_windows, dtype=int), 'issues': np.zeros(n_windows, dtype=int)}
+
+    times = np.array(created, dtype='datetime64[s]')
+    is_pr = np.array(is_pr, dtype=bool)
+    window = np.searchsorted(edges, times, side='right') - 1
+    valid = (window >= 0) & (window < n_windows)
+
+    return {
+        'prs': np.bincount(window[valid & is_pr], minlength=n_windows),
+        'issues': np.bincount(window[valid & ~is_pr], minlength=n_windows),
+    }
+
+# 窓ごとの件数は counts テーブルに窓ごとの行として保存する (start_date / end_date は窓の両端)
+WINDOW_METRICS = ('prs', 'issues')
+
+def get_windowed_counts(owner: str, repo: str, start_date: str, end_date: str, freq: str = 'monthly', store: ResultStore | None = None) -> 'tuple[np.ndarray, dict[str, np.ndarray]]':
+    """
+    Pull request and issue counts per window between two dates, read from the result store
+    or counted with one paginated fetch (see get_created_counts_by_window) and stored.
+
+    :param owner: The owner of the repository.
+    :param repo: The name of the repository.
+    :param start_date: Start date (YYYY-MM-DD or YYYY-MM-DDTHH:MM:SSZ).
+    :param end_date: Last day included (YYYY-MM-DD or YYYY-MM-DDTHH:MM:SSZ).
+    :param freq: 'daily', 'weekly' or 'monthly'.
+    :param store: Result store checked before calling the API (default is default_store()).
+    :return: (window edges from make_windows, {'prs': counts, 'issues': counts}).
+    """
+    import numpy as np
+
+    if store is None:
+        store = default_store()
+
+    edges = make_windows(start_date, end_date, freq)
+    bounds = [(f"{a}Z", f"{b}Z") for a, b in zip(edges[:-1], edges[1:])]
+    stored = {m: [store.get(owner, repo, a, b, f"window:{m}") for a, b in bounds] for m in WINDOW_METRICS}
+    hit = all(value is not None for values in stored.values() for value in values)
+    store_lookups.inc(metric='windows', result='hit' if hit else 'miss')
+    if hit:
+        return edges, {m: np.array(values, dtype=int) for m, values in stored.items()}
+
+    counts = get_created_counts_by_window(owner, repo, edges)
+    store.put_many(owner, repo, [
+        (a, b, f"window:{m}", value)
+        for m in WINDOW_METRICS
+        for (a, b), value in zip(bounds, counts[m])
+    ])
+    return edges, counts
+
+def _with_query(url: str, **params) -> str:
+    """
+    Return the URL with the given query parameters set (None removes a parameter).
+    """
+    parsed = urlparse(url)
+    query = {k: v[-1] for k, v in parse_qs(parsed.query).items()}
+    for key, value in params.items():
+        if value is None:
+            query.pop(key, None)
+        else:
+            query[key] = str(value)
+    return urlunparse(parsed._replace(query=urlencode(query, safe=':+')))
+
+def count_from_link(url: str) -> int:
+    """
+    Count the number of items with the 'Link' header.
+    GitHub API returns paginated results, but not counts items of the all pages.
+    This function requests the endpoint with per_page=1, so the page number of the
+    'last' link in the 'Link' header is exactly the total number of items (one request).
+
+    :param url: The GitHub API endpoint URL to count items from.
+    :return: Number of items in the 'Link' header.
+    """
+
+    headers, data = fetch_data_from_github_once(_with_query(url, per_page=1, page=None))
+
+    link_header = headers.get('Link') or headers.get('link')
+    if not link_header:
+        # 1 ページに収まる場合は Link ヘッダが付かない
+        return len(data) if data else 0
+
+    match = re.search(r'<([^>]+)>;\s*rel="last"', link_header)
+    if not match:
+        # 'last' が無いのは最終ページを取得した場合のみ
+        return len(data) if data else 0
+
+    last_page_num = parse_qs(urlparse(match.group(1)).query).get('page', [None])[0]
+    if last_page_num is None:
+        raise Exception("Could not determine the last page number from the 'Link' header.")
+
+    return int(last_page_num)
+
+def count_endpoints(urls: list[str], max_workers: int = 8) -> list[int]:
+    """
+    Count many endpoints concurrently with count_from_link.
+
+    :param urls: GitHub API endpoint URLs.
+    :param max_workers: Number of concurrent requests.
+    :return: Counts in the same order as urls.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(count_from_link, urls))
+
+REPOSITORY_ENDPOINTS = ['commits', 'contributors', 'tags', 'releases']
+
+def get_repository_counts(owner: str, repo: str, endpoints: list[str] = REPOSITORY_ENDPOINTS, max_workers: int = 4) -> dict[str, int]:
+    """
+    Count items of several repository endpoints (commits, contributors, tags, releases) concurrently.
+
+    :param owner: The owner of the repository.
+    :param repo: The name of the repository.
+    :param endpoints: Endpoint names under /repos/{owner}/{repo}/.
+    :param max_workers: Number of concurrent requests.
+    :return: Dict of endpoint name to count.
+    """
+    urls = [f"https://api.github.com/repos/{owner}/{repo}/{endpoint}" for endpoint in endpoints]
+    if 'contributors' in endpoints:
+        urls[endpoints.index('contributors')] += "?anon=1"
+    return dict(zip(endpoints, count_endpoints(urls, max_workers=max_workers)))
+
+REPOSITORY_COLUMNS = ['id', 'full_name', 'stars', 'pr_count', 'issue_count', 'commit_count', 'language']
+
+def repositories_frame(records: list[dict]) -> 'pd.DataFrame':
+    """
+    Build a columnar frame of repositories.
+
+    :param records: List of dicts with keys in REPOSITORY_COLUMNS (missing counts become NaN).
+    :return: DataFrame with one row per repository.
+    """
+    import pandas as pd
+
+    return pd.DataFrame.from_records(records, columns=REPOSITORY_COLUMNS)
+
+def repository_record(top: dict, language: str, pr_count: int | None = None, issue_count: int | None = None, commit_count: int | None = None) -> dict:
+    """
+    Convert a search result item into a repository record.
+
+    :param top: Repository item from the GitHub search API.
+    :param language: The language the repository was searched under.
+    :param pr_count: Number of pull requests (optional).
+    :param issue_count: Number of issues (optional).
+    :param commit_count: Number of commits (optional).
+    :return: Dict with keys in REPOSITORY_COLUMNS (plus node_id for GraphQL enrichment).
+    """
+    return {
+        'id': top['id'],
+        'full_name': top['full_name'],
+        'node_id': top.get('node_id'),
+        'stars': top['stargazers_count'],
+        'pr_count': pr_count,
+        'issue_count': issue_count,
+        'commit_count': commit_count,
+        'language': language,
+    }
+
+def windows_frame(records: list[dict]) -> 'pd.DataFrame':
+    """
+    Build a long frame of per-window counts (one row per repository and window).
+
+    :param records: Repository records from collect_records(windows=...).
+    :return: DataFrame with full_name, language, window_start, window_end, prs and issues.
+    """
+    import pandas as pd
+
+    rows = [
+        {'full_name': r['full_name'], 'language': r['language'], 'window_start': start, 'window_end': end, 'prs': prs, 'issues': issues}
+        for r in records if 'windows' in r
+        for start, end, prs, issues in zip(r['windows']['start'], r['windows']['end'], r['windows']['prs'], r['windows']['issues'])
+    ]
+    return pd.DataFrame.from_records(rows, columns=['full_name', 'language', 'window_start', 'window_end', 'prs', 'issues'])
+
+def save_repositories_frame(frame: 'pd.DataFrame', path: str) -> str:
+    """
+    Save a repository frame so that it can be re-plotted without scraping.
+
+    :param frame: The repository frame.
+    :param path: Output CSV path.
+    :return: The output path.
+    """
+    frame.to_csv(path, index=False)
+    return path
+
+def load_repositories_frame(path: str) -> 'pd.DataFrame':
+    """
+    Load a repository frame saved by save_repositories_frame.
+
+    :param path: CSV path.
+    :return: The repository frame.
+    """
+    import pandas as pd
+
+    return pd.read_csv(path)
+
+def collect_records(langs: list[str], per_page: int = 25, days: int = 180, workers: int = 4, store: ResultStore | None = None, details: bool = False, windows: str | None = None) -> list[dict]:
+    """
+    Collect PR, issue and commit counts for the top repositories of each language.
+    Runs as a pipeline (discover -> enrich -> persist), so searching the next language
+    overlaps with counting the current one.
+    With windows, PRs and issues are counted per window from the issues listing
+    (get_windowed_counts) and the totals are their sums, which also saves two search
+    requests per repository.
+
+    :param langs: Languages to search.
+    :param per_page: Number of top repositories per language.
+    :param days: Length of the window after each repository's creation.
+    :param workers: Number of concurrent count workers.
+    :param store: Result store for counts and repositories (default is default_store()).
+    :param details: Also store languages, topics and contributors of every repository,
+        fetched 100 at a time with GraphQL.
+    :param windows: 'daily', 'weekly' or 'monthly' to also count PRs and issues per window
+        (kept under each record's 'windows' key, see windows_frame).
+    :return: Repository records with counts, in language order.
+    """
+    if store is None:
+        store = default_store()
+
+    def discover(lang: str):
+        search_limiter.acquire()
+        return [(lang, top) for top in get_top_repositories(lang, per_page=per_page)]
+
+    def enrich(item: tuple[str, dict]) -> dict:
+        lang, top = item
+        owner, name = top['owner']['login'], top['name']
+        start = top['created_at']
+        end = after_days(start, days)
+        if windows is None:
+            pr_count = get_prs_counts_between_dates(owner, name, start, end, store)
+            issue_count = get_issues_counts_between_dates(owner, name, start, end, store)
+        else:
+            edges, counts = get_windowed_counts(owner, name, start, end, windows, store)
+            pr_count, issue_count = int(counts['prs'].sum()), int(counts['issues'].sum())
+        commit_count = get_commits_counts_between_dates(owner, name, start, end, store)
+        print(f"{owner}/{name} - PRs: {pr_count}, Issues: {issue_count}, Commits: {commit_count}")
+        record = repository_record(top, lang, pr_count, issue_count, commit_count)
+        if windows is not None:
+            record['windows'] = {
+                'start': [str(e) for e in edges[:-1]],
+                'end': [str(e) for e in edges[1:]],
+                'prs': counts['prs'].tolist(),
+                'issues': counts['issues'].tolist(),
+            }
+        return record
+
+    def persist(record: dict) -> dict:
+        store.put_repository(record)
+        return record
+
+    pipeline = Pipeline([
+        Stage('discover', discover, workers=1, fan_out=True, queue_size=len(langs)),
+        Stage('enrich', enrich, workers=workers, queue_size=per_page),
+        Stage('persist', persist, workers=1, queue_size=per_page),
+    ])
+    records = pipeline.run(langs)
+    pipeline.print_stats()
+
+    if details:
+        from .graphql import enrich_repositories
+
+        enrich_repositories([r['node_id'] for r in records if r.get('node_id')], store)
+
+    # 完了順ではなく言語順に並べ直す
+    order = {lang: i for i, lang in enumerate(langs)}
+    records.sort(key=lambda r: (order[r['language']], -r['stars']))
+    return records
+
+def collect_counts(langs: list[str], per_page: int = 25, days: int = 180, workers: int = 4, store: ResultStore | None = None, details: bool = False, windows: str | None = None) -> 'pd.DataFrame':
+    """
+    Repository frame of collect_records (same arguments).
+    """
+    return repositories_frame(collect_records(langs, per_page, days, workers, store, details, windows))
+
+def plot_stars_by_id(frame: 'pd.DataFrame', path: str, langs: list | None = None, colors: list | None = None) -> str:
+    """
+    Plot repository ID against stars, one color per language.
+
+    :param frame: The repository frame.
+    :param path: Output image path.
+    :param langs: Language order for colors and legend.
+    :param colors: Colors matched to langs.
+    :return: The output image path.
+    """
+    from .plotting import figure, save_figure, scatter_by_category
+
+    with figure(figsize=(10, 6)) as fig:
+        ax = fig.add_subplot(1,1,1)
+        scatter_by_category(ax, frame, 'id', 'stars', order=langs, colors=colors)
+
+        # ax.set_xlim(0, 400000000)
+        # ax.set_ylim(0, 200000)
+        ax.set_xlabel('Repository ID')
+        ax.set_ylabel('Stars')
+        ax.set_title('Top Repository by Language')
+
+        return save_figure(fig, path)
+
+def plot_prs_and_issues(frame: 'pd.DataFrame', path: str, langs: list | None = None, colors: list | None = None) -> str:
+    """
+    Plot pull request counts against issue counts, one color per language.
+
+    :param frame: The repository frame.
+    :param path: Output image path.
+    :param langs: Language order for colors and legend.
+    :param colors: Colors matched to langs.
+    :return: The output image path.
+    """
+    from .plotting import figure, save_figure, scatter_by_category
+
+    with figure(figsize=(8, 8)) as fig:
+        ax = fig.add_subplot(1,1,1)
+        scatter_by_category(ax, frame, 'pr_count', 'issue_count', order=langs, colors=colors)
+
+        ax.set_xlabel('Pull Requests')
+        ax.set_ylabel('Issues')
+        ax.set_title(f'PRs and Issues - 180 Days From Created Repositories')
+        ax.set_aspect('equal')
+        ax.set_xlim(-25, 1000)
+        ax.set_ylim(-25, 1000)
+
+        return save_figure(fig, path)
+
+def plot_top_repositories(langs: list[str], per_page: int = 100, csv_path: str = "result_1-1.csv", image_path: str = "result_1-1.png") -> 'pd.DataFrame':
+    """
+    Plot repository ID against stars for the top repositories of each language (mode 0).
+
+    :param langs: Languages to search.
+    :param per_page: Number of top repositories per language.
+    :param csv_path: Path to save the repository frame to.
+    :param image_path: Path to save the plot to.
+    :return: The repository frame.
+    """
+    records = []
+    for lang in langs:
+        search_limiter.acquire()
+        tops = get_top_repositories(lang, per_page=per_page)
+        records.extend(repository_record(top, lang) for top in tops)
+
+    frame = repositories_frame(records)
+    save_repositories_frame(frame, csv_path)
+    plot_stars_by_id(frame, image_path, langs, colors_for(langs))
+    return frame
+
+def plot_counts(langs: list[str], per_page: int = 25, days: int = 180, workers: int = 4, store: ResultStore | None = None, csv_path: str = "result_2-2.csv", image_path: str = "result_2-2.png", details: bool = False, windows: str | None = None, windows_csv_path: str = "result_2-2_windows.csv") -> 'pd.DataFrame':
+    """
+    Plot PR counts against issue counts for the top repositories of each language (mode 1).
+
+    :param langs: Languages to search.
+    :param per_page: Number of top repositories per language.
+    :param days: Length of the window after each repository's creation.
+    :param workers: Number of concurrent count workers.
+    :param store: Result store for counts and repositories (default is default_store()).
+    :param csv_path: Path to save the repository frame to.
+    :param image_path: Path to save the plot to.
+    :param details: Also store GraphQL details of every repository (see collect_records).
+    :param windows: 'daily', 'weekly' or 'monthly' to also save per-window counts (see collect_records).
+    :param windows_csv_path: Path to save the per-window counts to.
+    :return: The repository frame.
+    """
+    records = collect_records(langs, per_page=per_page, days=days, workers=workers, store=store, details=details, windows=windows)
+    frame = repositories_frame(records)
+    save_repositories_frame(frame, csv_path)
+    if windows is not None:
+        windows_frame(records).to_csv(windows_csv_path, index=False)
+        print(f"Per-window counts written to {windows_csv_path}")
+    plot_prs_and_issues(frame, image_path, langs, colors_for(langs))
+    return frame
+
+def harvest_corpus(langs: list[str], pages: int = 5, sharded: bool = False, min_stars: int = 10, workers: int = 4) -> dict[str, list[str]]:
+    """
+    Collect the descriptions of repositories of each language.
+
+    :param langs: Languages to search.
+    :param pages: Number of search pages of the top repositories (100 each, at most 10).
+    :param sharded: Use the sharded crawler to get every repository with at least min_stars stars.
+    :param min_stars: Minimum number of stars when sharded.
+    :param workers: Number of concurrent search requests when sharded.
+    :return: Dict of language to list of descriptions.
+    """
+    corpus = {}
+    for lang in langs:
+        if sharded:
+            # 検索を stars/created で分割して 1000 件の上限を超えて収集する
+            from .crawler import crawl_repositories
+
+            tops = crawl_repositories(lang, min_stars=min_stars, max_workers=workers)
+        else:
+            tops = []
+            for i in range(1, pages + 1):
+                search_limiter.acquire()
+                tops.extend(get_top_repositories(lang, per_page=100, pagination=i))
+        print(f"{lang}: {len(tops)} repositories")
+        corpus[lang] = [top['description'] for top in tops if top.get('description')]
+    return corpus
+
+def write_corpus(corpus: dict[str, list[str]], data_dir: str = "data", dedup: bool = True) -> None:
+    """
+    Write descriptions to {data_dir}/{lang}.txt, one per line.
+    With dedup, the harvested descriptions are kept in {data_dir}/raw/{lang}.txt and
+    {data_dir}/{lang}.txt gets the deduplicated ones, which every analysis reads.
+
+    :param corpus: Dict of language to list of descriptions.
+    :param data_dir: Output directory.
+    :param dedup: Drop exact and near-duplicate descriptions.
+    """
+    if dedup:
+        from .dedup import deduplicate_corpus
+
+        _write_lines(corpus, os.path.join(data_dir, "raw"))
+        corpus, _ = deduplicate_corpus(corpus)
+    _write_lines(corpus, data_dir)
+
+def _write_lines(corpus: dict[str, list[str]], data_dir: str) -> None:
+    os.makedirs(data_dir, exist_ok=True)
+    for lang, descriptions in corpus.items():
+        with open(os.path.join(data_dir, f"{lang}.txt"), "w") as f:
+            for description in descriptions:
+                f.write(f"{description}\n")
+
+def dedup_descriptions(langs: list[str], data_dir: str = "data", threshold: float | None = None) -> None:
+    """
+    Deduplicate an already harvested corpus again, reading {data_dir}/raw/{lang}.txt
+    (or {data_dir}/{lang}.txt for a corpus harvested without dedup).
+
+    :param langs: Languages to deduplicate.
+    :param data_dir: Corpus directory.
+    :param threshold: Estimated Jaccard similarity above which a description is a near duplicate.
+    """
+    from .dedup import THRESHOLD, deduplicate_corpus
+
+    corpus = {}
+    for lang in langs:
+        raw_path = os.path.join(data_dir, "raw", f"{lang}.txt")
+        path = raw_path if os.path.exists(raw_path) else os.path.join(data_dir, f"{lang}.txt")
+        with open(path) as f:
+            corpus[lang] = [line.rstrip("\n") for line in f if line.strip()]
+    _write_lines(corpus, os.path.join(data_dir, "raw"))
+    deduped, _ = deduplicate_corpus(corpus, THRESHOLD if threshold is None else threshold)
+    _write_lines(deduped, data_dir)
+
+def harvest_descriptions(langs: list[str], pages: int = 5, data_dir: str = "data", dedup: bool = True) -> None:
+    """
+    Write the descriptions of the top repositories of each language to {data_dir}/{lang}.txt (mode 2).
+
+    :param langs: Languages to search.
+    :param pages: Number of search pages (100 repositories each, at most 10).
+    :param data_dir: Output directory.
+    :param dedup: Drop exact and near-duplicate descriptions.
+    """
+    write_corpus(harvest_corpus(langs, pages=pages), data_dir, dedup)
+
+def harvest_descriptions_sharded(langs: list[str], min_stars: int = 10, workers: int = 4, data_dir: str = "data", dedup: bool = True) -> None:
+    """
+    Write descriptions of every repository with at least min_stars stars, using the sharded crawler (mode 4).
+
+    :param langs: Languages to search.
+    :param min_stars: Minimum number of stars.
+    :param workers: Number of concurrent search requests.
+    :param data_dir: Output directory.
+    :param dedup: Drop exact and near-duplicate descriptions.
+    """
+    write_corpus(harvest_corpus(langs, sharded=True, min_stars=min_stars, workers=workers), data_dir, dedup)
+
+def print_rate_limit() -> None:
+    """
+    Print the rate limit status of the GitHub API and of the local request layers (mode 9).
+    """
+    url = "https://api.github.com/rate_limit"
+    headers, data = fetch_data_from_github(url)
+    print("Rate Limit Data:", data)
+    print("Token Pool:", default_token_pool().status())
+    print("Retries:", dict(retry_metrics))
+    print("Deduplicated requests:", github_requests.hits)
+
+if __name__ == "__main__":
+    from .cli import main
+
+    main()
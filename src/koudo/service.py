@@ -0,0 +1,158 @@
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from .languages import LANGS
+from .withword2vec import EMBEDDINGS_PATH, TEXT_DIR
+
+class AnalysisState:
+    """
+    Corpus, TF-IDF terms and word vectors loaded once and reloaded when their files change.
+    """
+
+    def __init__(self, data_dir: str = TEXT_DIR, langs: list[str] = LANGS, embeddings_path: str = EMBEDDINGS_PATH, top_terms: int = 100, check_interval: float = 2.0):
+        """
+        :param data_dir: Directory of the description corpus.
+        :param langs: Languages to load.
+        :param embeddings_path: Path of the saved KeyedVectors.
+        :param top_terms: Number of TF-IDF terms kept per language.
+        :param check_interval: Minimum seconds between checks for changed files.
+        """
+        self.data_dir = data_dir
+        self.langs = langs
+        self.embeddings_path = embeddings_path
+        self.top_terms = top_terms
+        self.check_interval = check_interval
+        self.tfidf: dict[str, list[tuple[str, float]]] = {}
+        self.wv = None
+        self.index = None
+        self._mtimes: dict[str, float] = {}
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    def _paths(self) -> list[str]:
+        return [os.path.join(self.data_dir, f"{lang}.txt") for lang in self.langs] + [self.embeddings_path]
+
+    def _current_mtimes(self) -> dict[str, float]:
+        return {p: os.path.getmtime(p) for p in self._paths() if os.path.exists(p)}
+
+    def load(self) -> None:
+        """
+        (Re)load every artifact.
+        """
+        from .ann import load_or_build_index
+        from .tfidf import compute_tfidf
+        from .withword2vec import load_embeddings, load_texts
+
+        mtimes = self._current_mtimes()
+        texts = load_texts(self.data_dir, self.langs)
+        tfidf = compute_tfidf(texts, top=self.top_terms) if texts else {}
+        wv = load_embeddings(self.embeddings_path) if os.path.exists(self.embeddings_path) else None
+        index = load_or_build_index(wv, self.embeddings_path) if wv is not None else None
+
+        self.tfidf, self.wv, self.index, self._mtimes = tfidf, wv, index, mtimes
+        print(f"Loaded {len(tfidf)} languages, {0 if wv is None else len(wv.index_to_key)} word vectors.")
+
+    def refresh(self) -> None:
+        """
+        Reload if any artifact changed since the last load (checked at most every check_interval seconds).
+        """
+        now = time.monotonic()
+        if now - self._checked < self.check_interval:
+            return
+        with self._lock:
+            if now - self._checked < self.check_interval:
+                return
+            self._checked = now
+            if self._current_mtimes() != self._mtimes:
+                self.load()
+
+    def top_terms_for(self, lang: str, n: int = 10) -> list[tuple[str, float]]:
+        if lang not in self.tfidf:
+            raise KeyError(f"Unknown language: {lang}")
+        return self.tfidf[lang][:n]
+
+    def similarity(self, a: str, b: str) -> float:
+        self._require_vectors()
+        return float(self.wv.similarity(a, b))
+
+    def neighbors(self, words: list[str], k: int = 10) -> list[list[tuple[str, float]]]:
+        self._require_vectors()
+        missing = [w for w in words if w not in self.wv.key_to_index]
+        if missing:
+            raise KeyError(f"Not in vocabulary: {', '.join(missing)}")
+        return self.index.most_similar(words, k)
+
+    def _require_vectors(self) -> None:
+        if self.wv is None:
+            raise LookupError(f"No word vectors at {self.embeddings_path}. Run 'koudo w2v' first.")
+
+def _make_handler(state: AnalysisState):
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status: int, body: dict) -> None:
+            data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self) -> None:
+            url = urlparse(self.path)
+            query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+
+            def param(name: str) -> str:
+                if name not in query:
+                    raise ValueError(f"Missing query parameter: {name}")
+                return query[name]
+
+            state.refresh()
+            try:
+                if url.path == '/health':
+                    self._send(200, {'status': 'ok', 'languages': sorted(state.tfidf), 'vectors': state.wv is not None})
+                elif url.path == '/top-terms':
+                    lang = param('lang')
+                    self._send(200, {'lang': lang, 'terms': state.top_terms_for(lang, int(query.get('n', 10)))})
+                elif url.path == '/similarity':
+                    a, b = param('a'), param('b')
+                    self._send(200, {'a': a, 'b': b, 'similarity': state.similarity(a, b)})
+                elif url.path == '/neighbors':
+                    word = param('word')
+                    self._send(200, {'word': word, 'neighbors': state.neighbors([word], int(query.get('k', 10)))[0]})
+                elif url.path == '/neighbors-batch':
+                    words = param('words').split(',')
+                    neighbors = state.neighbors(words, int(query.get('k', 10)))
+                    self._send(200, {'neighbors': dict(zip(words, neighbors))})
+                else:
+                    self._send(404, {'error': f"Unknown path: {url.path}"})
+            except KeyError as e:
+                # 未知の言語・語彙外の単語
+                self._send(404, {'error': str(e)})
+            except (LookupError, ValueError) as e:
+                self._send(400, {'error': str(e)})
+
+        def log_message(self, format, *args) -> None:
+            pass
+
+    return Handler
+
+def serve(host: str = '127.0.0.1', port: int = 8000, data_dir: str = TEXT_DIR, langs: list[str] = LANGS, embeddings_path: str = EMBEDDINGS_PATH) -> None:
+    """
+    Serve top-terms, similarity and nearest-neighbor queries over HTTP until interrupted.
+
+    GET /top-terms?lang=go&n=10, /similarity?a=web&b=framework, /neighbors?word=framework&k=10,
+    /neighbors-batch?words=web,framework&k=10, /health
+    """
+    state = AnalysisState(data_dir, langs, embeddings_path)
+    state.load()
+    server = ThreadingHTTPServer((host, port), _make_handler(state))
+    print(f"Serving on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,52 @@
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Hashable
+
+class SingleFlight:
+    """
+    Merge identical in-flight calls into one and remember their results for the rest of the run.
+    Failed calls are not remembered, so the next caller tries again.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._futures: dict[Hashable, Future] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """
+        Return the result of fn for key, calling fn at most once across threads.
+
+        :param key: Identity of the call (e.g. the request URL).
+        :param fn: Function computing the result.
+        :return: The (possibly shared) result.
+        """
+        with self._lock:
+            future = self._futures.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._futures[key] = future
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        if leader:
+            try:
+                future.set_result(fn())
+            except BaseException as e:
+                with self._lock:
+                    del self._futures[key]
+                future.set_exception(e)
+                raise
+
+        return future.result()
+
+    def forget(self, key: Hashable) -> None:
+        with self._lock:
+            self._futures.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._futures.clear()
@@ -0,0 +1,239 @@
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+
+DEFAULT_STORE_PATH = 'data/results.sqlite3'
+
+# GraphQL でまとめて取得する追加の列 (古いファイルには開くときに追加する)
+DETAIL_COLUMNS = {
+    'node_id': 'TEXT',
+    'primary_language': 'TEXT',
+    'languages': 'TEXT',
+    'topics': 'TEXT',
+    'contributor_count': 'INTEGER',
+    'fork_count': 'INTEGER',
+    'details_updated_at': 'TEXT',
+}
+
+class ResultStore:
+    """
+    SQLite table of per-repository counts keyed by (owner, repo, start_date, end_date, metric).
+    """
+
+    def __init__(self, path: str = DEFAULT_STORE_PATH):
+        """
+        Open (and create if needed) the result store.
+
+        :param path: Path to the SQLite file, or ':memory:'.
+        """
+        if path != ':memory:' and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS counts (
+                owner TEXT NOT NULL,
+                repo TEXT NOT NULL,
+                start_date TEXT NOT NULL,
+                end_date TEXT NOT NULL,
+                metric TEXT NOT NULL,
+                value INTEGER NOT NULL,
+                fetched_at TEXT NOT NULL,
+                PRIMARY KEY (owner, repo, start_date, end_date, metric)
+            )
+            """
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS repositories (
+                id INTEGER PRIMARY KEY,
+                full_name TEXT NOT NULL,
+                language TEXT,
+                stars INTEGER,
+                pr_count INTEGER,
+                issue_count INTEGER,
+                commit_count INTEGER,
+                updated_at TEXT NOT NULL
+            )
+            """
+        )
+        existing = {row[1] for row in self._conn.execute("PRAGMA table_info(repositories)")}
+        for column, kind in DETAIL_COLUMNS.items():
+            if column not in existing:
+                self._conn.execute(f"ALTER TABLE repositories ADD COLUMN {column} {kind}")
+        self._conn.commit()
+
+    def get(self, owner: str, repo: str, start_date: str, end_date: str, metric: str) -> int | None:
+        """
+        Look up a stored count.
+
+        :return: The stored value, or None if it has not been fetched yet.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM counts WHERE owner = ? AND repo = ? AND start_date = ? AND end_date = ? AND metric = ?",
+                (owner, repo, start_date, end_date, metric),
+            ).fetchone()
+        return None if row is None else int(row[0])
+
+    def put(self, owner: str, repo: str, start_date: str, end_date: str, metric: str, value: int) -> None:
+        """
+        Insert or replace a count.
+        """
+        fetched_at = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO counts (owner, repo, start_date, end_date, metric, value, fetched_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (owner, repo, start_date, end_date, metric)
+                DO UPDATE SET value = excluded.value, fetched_at = excluded.fetched_at
+                """,
+                (owner, repo, start_date, end_date, metric, int(value), fetched_at),
+            )
+            self._conn.commit()
+
+    def put_many(self, owner: str, repo: str, rows: list[tuple[str, str, str, int]]) -> None:
+        """
+        Insert or replace many counts of one repository in one transaction.
+
+        :param rows: List of (start_date, end_date, metric, value).
+        """
+        fetched_at = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        with self._lock:
+            self._conn.executemany(
+                """
+                INSERT INTO counts (owner, repo, start_date, end_date, metric, value, fetched_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (owner, repo, start_date, end_date, metric)
+                DO UPDATE SET value = excluded.value, fetched_at = excluded.fetched_at
+                """,
+                [(owner, repo, start, end, metric, int(value), fetched_at) for start, end, metric, value in rows],
+            )
+            self._conn.commit()
+
+    def put_repository(self, record: dict) -> None:
+        """
+        Insert or update a repository record (keys as in scraping.REPOSITORY_COLUMNS).
+        Counts that are None keep their stored value.
+        """
+        updated_at = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO repositories (id, full_name, language, stars, pr_count, issue_count, commit_count, node_id, updated_at)
+                VALUES (:id, :full_name, :language, :stars, :pr_count, :issue_count, :commit_count, :node_id, :updated_at)
+                ON CONFLICT (id) DO UPDATE SET
+                    full_name = excluded.full_name,
+                    node_id = COALESCE(excluded.node_id, repositories.node_id),
+                    language = excluded.language,
+                    stars = excluded.stars,
+                    pr_count = COALESCE(excluded.pr_count, repositories.pr_count),
+                    issue_count = COALESCE(excluded.issue_count, repositories.issue_count),
+                    commit_count = COALESCE(excluded.commit_count, repositories.commit_count),
+                    updated_at = excluded.updated_at
+                """,
+                {
+                    'id': record['id'],
+                    'full_name': record['full_name'],
+                    'language': record.get('language'),
+                    'stars': record.get('stars'),
+                    'pr_count': record.get('pr_count'),
+                    'issue_count': record.get('issue_count'),
+                    'commit_count': record.get('commit_count'),
+                    'node_id': record.get('node_id'),
+                    'updated_at': updated_at,
+                },
+            )
+            self._conn.commit()
+
+    def put_repository_details(self, details: dict) -> None:
+        """
+        Merge extra fields fetched by GraphQL into a repository record
+        (keys: id, full_name, node_id and the DETAIL_COLUMNS; languages and topics are stored as JSON).
+        """
+        updated_at = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO repositories (id, full_name, node_id, primary_language, languages, topics, contributor_count, fork_count, updated_at, details_updated_at)
+                VALUES (:id, :full_name, :node_id, :primary_language, :languages, :topics, :contributor_count, :fork_count, :updated_at, :updated_at)
+                ON CONFLICT (id) DO UPDATE SET
+                    node_id = excluded.node_id,
+                    primary_language = excluded.primary_language,
+                    languages = excluded.languages,
+                    topics = excluded.topics,
+                    contributor_count = excluded.contributor_count,
+                    fork_count = excluded.fork_count,
+                    details_updated_at = excluded.details_updated_at
+                """,
+                {
+                    'id': details['id'],
+                    'full_name': details['full_name'],
+                    'node_id': details['node_id'],
+                    'primary_language': details.get('primary_language'),
+                    'languages': json.dumps(details.get('languages') or {}),
+                    'topics': json.dumps(details.get('topics') or []),
+                    'contributor_count': details.get('contributor_count'),
+                    'fork_count': details.get('fork_count'),
+                    'updated_at': updated_at,
+                },
+            )
+            self._conn.commit()
+
+    def node_ids(self, missing_details: bool = True) -> list[str]:
+        """
+        GraphQL node IDs of the stored repositories.
+
+        :param missing_details: Only repositories whose details have not been fetched yet.
+        """
+        query = "SELECT node_id FROM repositories WHERE node_id IS NOT NULL"
+        if missing_details:
+            query += " AND details_updated_at IS NULL"
+        with self._lock:
+            return [row[0] for row in self._conn.execute(query + " ORDER BY id")]
+
+    def repositories(self):
+        """
+        Read the stored repositories as a DataFrame.
+        """
+        import pandas as pd
+
+        with self._lock:
+            return pd.read_sql_query("SELECT * FROM repositories", self._conn)
+
+    def frame(self, metric: str | None = None):
+        """
+        Read the stored counts as a DataFrame.
+
+        :param metric: Only return rows for this metric (default is all).
+        :return: pandas DataFrame with the columns of the counts table.
+        """
+        import pandas as pd
+
+        query = "SELECT * FROM counts"
+        params: tuple = ()
+        if metric is not None:
+            query += " WHERE metric = ?"
+            params = (metric,)
+        with self._lock:
+            return pd.read_sql_query(query, self._conn, params=params)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+_default_store: ResultStore | None = None
+
+def default_store() -> ResultStore:
+    """
+    Return the process-wide store at DEFAULT_STORE_PATH, opening it on first use.
+    """
+    global _default_store
+    if _default_store is None:
+        _default_store = ResultStore()
+    return _default_store
@@ -0,0 +1,64 @@
+import sys
+import string
+from .languages import LANGS
+from .parallel import map_languages
+from .profiling import text_size, traced, tracer
+
+def english_stop_words():
+    from sklearn.feature_extraction import text
+
+    # 英語のストップワードと記号を除外
+    return text.ENGLISH_STOP_WORDS.union(set(string.punctuation))
+
+# TfidfVectorizerでストップワードを指定
+def load_text(filename):
+    with open(filename, encoding='utf-8') as f:
+        return f.read()
+
+def top_terms(lang, document, top=10):
+    """
+    Compute the top TF-IDF terms of one language's text.
+
+    :param lang: Language (used to label the trace span).
+    :param document: Text of the language.
+    :param top: Number of terms to return.
+    :return: List of (term, score), best first.
+    """
+    # sklearn は読み込みが重いので実行時に import する
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    vectorizer = TfidfVectorizer(stop_words=list(english_stop_words()))
+    with tracer.span('tfidf.fit', bytes=text_size(document), lang=lang) as span:
+        tfidf_matrix = vectorizer.fit_transform([document])
+        span.items = tfidf_matrix.shape[1]
+    feature_names = vectorizer.get_feature_names_out()
+    scores = tfidf_matrix.toarray()[0]
+
+    # 単語とスコアをペアにしてソート
+    word_scores = sorted(zip(feature_names, scores), key=lambda x: x[1], reverse=True)
+    return [(str(word), float(score)) for word, score in word_scores[:top]]
+
+@traced('compute_tfidf', size=text_size, count=len)
+def compute_tfidf(texts, top=10, workers=None):
+    """
+    Compute the top TF-IDF terms of each language's text, one language per process.
+
+    :param texts: Dict of language to text.
+    :param top: Number of terms to return per language.
+    :param workers: Number of processes (default is the number of CPUs; 1 runs in this process).
+    :return: Dict of language to list of (term, score), best first, in the order of texts.
+    """
+    return map_languages(top_terms, texts, workers, top=top)
+
+def main(langs=LANGS, data_dir="data", top=10, workers=None):
+    texts = {lang: load_text(f"{data_dir}/{lang}.txt") for lang in langs}
+    for lang, word_scores in compute_tfidf(texts, top=top, workers=workers).items():
+        print(f"Language: {lang}")
+        print("上位の単語:")
+        for word, score in word_scores:
+            print(f"{word:12}: {score:.4f}")
+
+        print()
+
+if __name__ == "__main__":
+    main()
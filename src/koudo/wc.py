@@ -0,0 +1,55 @@
+import os
+
+from .languages import LANGS
+from .parallel import map_languages
+from .profiling import text_size, traced, tracer
+
+def render_wordcloud(lang, text):
+    # wordcloud は読み込みが重いので実行時に import する
+    from wordcloud import WordCloud
+
+    # ワードクラウド生成
+    with tracer.span('wordcloud.generate', bytes=text_size(text), lang=lang):
+        return WordCloud(font_path=None, width=800, height=400, background_color="white").generate(text)
+
+@traced('render_wordclouds', size=text_size, count=len)
+def render_wordclouds(texts, workers=None):
+    """
+    Generate a word cloud for each language's text, one language per process.
+
+    :param texts: Dict of language to text.
+    :param workers: Number of processes (default is the number of CPUs; 1 runs in this process).
+    :return: Dict of language to WordCloud, in the order of texts.
+    """
+    return map_languages(render_wordcloud, texts, workers)
+
+def save_wordcloud(wc, lang, path):
+    from .plotting import figure, save_figure
+
+    # 描画 (同じサイズの図を使い回してメモリ増加を防ぐ)
+    with figure(figsize=(10, 5), reuse=True) as fig:
+        ax = fig.add_subplot(1, 1, 1)
+        ax.imshow(wc, interpolation="bilinear")
+        ax.axis("off")  # 軸を非表示にする
+        ax.set_title(f"{lang.capitalize()} Language Word Cloud")
+        return save_figure(fig, path)
+
+def render_file(lang, paths):
+    # 1 言語分の読み込み・生成・保存 (ワーカープロセスで実行する)
+    source, target = paths
+    with open(source, 'r', encoding='utf-8') as file:
+        text = file.read()
+
+    wc = render_wordcloud(lang, text)
+    return save_wordcloud(wc, lang, target)
+
+def main(langs=LANGS, data_dir='data', output_dir='.', fmt='png', workers=None):
+    paths = {
+        lang: (os.path.join(data_dir, f'{lang}.txt'), os.path.join(output_dir, f"result_3-{i+1}.{fmt}"))
+        for i, lang in enumerate(langs)
+    }
+    with tracer.span('render_wordclouds', items=len(paths)):
+        map_languages(render_file, paths, workers)
+
+if __name__ == "__main__":
+    main()
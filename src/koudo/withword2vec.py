@@ -0,0 +1,181 @@
+import os
+import glob # 使われていないが、もし将来使う可能性があれば残しても良い
+import re
+
+from .languages import LANGS
+from .profiling import text_size, traced, tracer
+
+# numpy / gensim / sklearn / matplotlib は読み込みが重いので，使う関数の中で import する
+
+# テキストファイルがあるディレクトリ
+TEXT_DIR = './data'  # 適宜変更
+# 学習した単語ベクトルの保存先 (.npy にすると生の行列形式)
+EMBEDDINGS_PATH = './data/w2v.kv'
+
+# テキストファイルの読み込み
+def load_texts(text_dir, langs=LANGS):
+    texts = {}
+    for lang in langs:
+        file_path = os.path.join(text_dir, f"{lang}.txt") # os.path.join を使用してパスを構築
+        if os.path.exists(file_path): # ファイルの存在を確認
+            with open(file_path, encoding='utf-8') as f:
+                texts[lang] = f.read()
+        else:
+            print(f"Warning: File not found for language '{lang}' at {file_path}. Skipping.")
+    return texts
+
+# 簡易的な単語分割（日本語の場合はMeCab等を推奨）
+@traced('tokenize', size=text_size, count=len)
+def tokenize(text):
+    return re.findall(r'\b\w+\b', text.lower())
+
+def english_stop_words():
+    from sklearn.feature_extraction import text
+
+    return frozenset(text.ENGLISH_STOP_WORDS)  # 英語のストップワード
+
+# 1 ファイルの頻出単語を取得 (数え方と同数の順序は counting の count_files と同じ)
+def top_words_of(fname, text_content, top_n=30):
+    from .counting import count_text, top_n as most_common
+
+    return [w for w, _ in most_common(count_text(text_content, english_stop_words()), top_n)]
+
+# 各ファイルの頻出単語を取得 (ファイルごとに別プロセスで数え，結果は texts の順に並ぶ)
+@traced('get_top_words', size=text_size, count=len)
+def get_top_words(texts, top_n=30, workers=None):
+    from .parallel import map_languages
+
+    return map_languages(top_words_of, texts, workers, top_n=top_n)
+
+# ファイルをブロック単位で並列に数えて頻出単語を取得 (メモリに載らない大きさでもよい)
+def top_words_of_files(paths, top_n=30, workers=None):
+    from .counting import count_files, top_n as most_common
+
+    counts = count_files(paths, english_stop_words(), workers=workers)
+    return {key: [w for w, _ in most_common(counts[key], top_n)] for key in paths}
+
+def get_top_words_from_files(text_dir, langs=LANGS, top_n=30, workers=None):
+    paths = {lang: os.path.join(text_dir, f"{lang}.txt") for lang in langs}
+    paths = {lang: path for lang, path in paths.items() if os.path.exists(path)}
+    return top_words_of_files(paths, top_n, workers)
+
+# Word2Vecモデルの学習
+@traced('train_word2vec', size=text_size)
+def train_word2vec(texts):
+    from gensim.models import Word2Vec
+
+    sentences = [tokenize(text) for text in texts.values()]
+    # sentencesが空の場合のハンドリング
+    if not sentences:
+        print("Warning: No sentences to train Word2Vec model.")
+        return None
+    model = Word2Vec(sentences, vector_size=100, window=5, min_count=1, workers=2, seed=42)
+    return model
+
+# 学習済みの単語ベクトル (KeyedVectors) だけを返す
+def train_embeddings(texts):
+    model = train_word2vec(texts)
+    return None if model is None else model.wv
+
+# 単語ベクトルの保存と読み込み (mmap='r' で読み込むと複数プロセスでページキャッシュを共有できる)
+# path が .npy で終わる場合は生の行列 + 語彙の形式 (embeddings.py) を使う
+def save_embeddings(wv, path):
+    if path.endswith('.npy'):
+        from .embeddings import save_vectors
+
+        return save_vectors(wv, path)
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    # sep_limit=0 で配列をすべて別の .npy に書き出し，mmap で読めるようにする
+    wv.save(path, sep_limit=0)
+    return path
+
+def load_embeddings(path, mmap='r'):
+    if path.endswith('.npy'):
+        from .embeddings import MappedVectors
+
+        return MappedVectors.load(path, mmap=mmap)
+
+    from gensim.models import KeyedVectors
+
+    return KeyedVectors.load(path, mmap=mmap)
+
+# 1 言語の頻出単語を t-SNE で 2 次元にする (語彙にない単語は除く)
+def tsne_coordinates(words, wv, perplexity=30):
+    from sklearn.manifold import TSNE
+    from .embeddings import lookup_vectors
+
+    # 語彙にある単語のベクトルをまとめて取り出す
+    vectors, labels = lookup_vectors(wv, words)
+    if len(vectors) == 0:
+        return vectors[:, :2], labels
+    # perplexityはn_samples未満である必要がある
+    # len(vectors) >= 2 であることは保証されている
+    perplexity = min(perplexity, len(vectors) - 1)
+    tsne = TSNE(n_components=2, random_state=42, perplexity=perplexity, init='random', learning_rate='auto') # initとlearning_rateを追加 (TSNEの警告対策)
+    with tracer.span('tsne.fit', bytes=vectors.nbytes, items=len(vectors)):
+        return tsne.fit_transform(vectors), labels
+
+# 言語ごとの t-SNE の座標 ({言語: (座標, 単語)}) を描画
+# colors は coordinates の順の色 (省略すると言語レジストリから取る; 何言語でも同じ言語は同じ色)
+def plot_tsne_coordinates(coordinates, output_dir='.', fmt='png', colors=None):
+    from .languages import colors_for
+    from .plotting import figure, save_figure
+
+    if colors is None:
+        colors = colors_for(list(coordinates))
+    colors = dict(zip(coordinates, colors))
+    with figure(figsize=(10, 10)) as fig: # 図のサイズを少し大きく
+        ax = fig.add_subplot(1, 1, 1)
+        for fname, (reduced, labels) in coordinates.items():
+            if len(reduced) == 0:
+                continue
+            ax.scatter(reduced[:,0], reduced[:,1], label=fname, alpha=0.7, color=colors[fname])
+            for i, label in enumerate(labels):
+                ax.annotate(label, (reduced[i,0], reduced[i,1]), fontsize=8)
+
+        ax.legend(bbox_to_anchor=(1.05, 1), loc='upper left') # 凡例がグラフと重ならないように調整
+        ax.set_title('t-SNE of Top Words per File')
+        ax.grid(True) # グリッドを追加
+        fig.tight_layout(rect=[0, 0, 0.85, 1]) # 凡例のためにスペースを確保
+        ax.set_xlim(-30, 30)
+        ax.set_ylim(-30, 30)
+        save_figure(fig, os.path.join(output_dir, f'4-2.{fmt}'))
+        ax.set_xlim(-5, 5)
+        ax.set_ylim(-5, 5)
+        save_figure(fig, os.path.join(output_dir, f'4-3.{fmt}')) # 軸の制限を適用した図を保存
+
+# t-SNEで可視化
+@traced('plot_tsne')
+def plot_tsne(top_words, model, output_dir='.', fmt='png', perplexity=30):
+    if model is None: # モデルが学習できなかった場合のハンドリング
+        print("Error: Word2Vec model is not trained. Cannot plot t-SNE.")
+        return
+
+    from .languages import colors_for
+
+    coordinates = {fname: tsne_coordinates(words, model.wv, perplexity) for fname, words in top_words.items()}
+    plot_tsne_coordinates(coordinates, output_dir, fmt, colors_for(list(coordinates)))
+
+def main(text_dir=TEXT_DIR, langs=LANGS, top_n=100, output_dir='.', fmt='png', embeddings_path=EMBEDDINGS_PATH, workers=None):
+    # データディレクトリが存在しない場合は作成
+    if not os.path.exists(text_dir):
+        print(f"Error: Directory '{text_dir}' not found. Please create it and place your language .txt files there.")
+        return
+
+    texts = load_texts(text_dir, langs)
+    if not texts: # テキストが読み込まれなかった場合のハンドリング
+        print("No texts loaded. Exiting.")
+        return
+
+    top_words = get_top_words_from_files(text_dir, list(texts), top_n=top_n, workers=workers)
+    model = train_word2vec(texts)
+    if model is not None and embeddings_path:
+        from .ann import build_index, index_path
+
+        save_embeddings(model.wv, embeddings_path)
+        build_index(model.wv).save(index_path(embeddings_path))
+    plot_tsne(top_words, model, output_dir, fmt)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,31 @@
+import numpy as np
+
+from koudo.ann import IVFIndex, _normalize, build_index, load_index, vectors_path
+
+class _Vectors:
+    def __init__(self, vectors: np.ndarray):
+        self.index_to_key = [f"w{i}" for i in range(len(vectors))]
+        self.key_to_index = {w: i for i, w in enumerate(self.index_to_key)}
+        self.vectors = vectors
+
+def _random_vectors(n: int, d: int) -> np.ndarray:
+    return np.random.default_rng(0).standard_normal((n, d)).astype(np.float32)
+
+def test_ivf_reaches_target_recall_on_unclustered_data():
+    vectors = _normalize(_random_vectors(5000, 32))
+    index = IVFIndex.build(vectors, target_recall=0.9)
+    queries = vectors[np.random.default_rng(1).choice(len(vectors), 100, replace=False)]
+    assert index.recall >= 0.9
+    assert index.measure_recall(queries) >= 0.85
+
+def test_saved_index_memory_maps_normalized_vectors(tmp_path):
+    wv = _Vectors(_random_vectors(2000, 16))
+    path = str(tmp_path / 'vectors.npy.ann.npz')
+    built = build_index(wv, kind='ivf')
+    built.save(path)
+
+    loaded = load_index(wv, path)
+    assert isinstance(loaded.vectors, np.memmap)
+    assert loaded.index.n_probe == built.index.n_probe
+    np.testing.assert_allclose(np.asarray(np.load(vectors_path(path))), built.vectors)
+    assert loaded.most_similar(['w1', 'w2'], k=5) == built.most_similar(['w1', 'w2'], k=5)
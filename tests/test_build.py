@@ -0,0 +1,94 @@
+import pytest
+
+from koudo.build import ArtifactStore, Graph, Output, Task, analysis_graph
+from koudo.languages import LanguageRegistry, default_registry, set_default_registry
+
+def test_tsne_plot_params_follow_registry_colors(tmp_path):
+    previous = default_registry()
+    try:
+        set_default_registry(LanguageRegistry(['python', 'go'], {'python': '#111111'}))
+        graph = analysis_graph(ArtifactStore(str(tmp_path)), str(tmp_path), ['python', 'go'])
+        first = graph.tasks['tsne-plot'].params['colors']
+        set_default_registry(LanguageRegistry(['python', 'go'], {'python': '#222222'}))
+        graph = analysis_graph(ArtifactStore(str(tmp_path)), str(tmp_path), ['python', 'go'])
+        second = graph.tasks['tsne-plot'].params['colors']
+    finally:
+        set_default_registry(previous)
+    assert first[0] == '#111111' and second[0] == '#222222'
+    assert first[1] == second[1]
+
+def _upper(out_dir, inputs, suffix=''):
+    with open(inputs['corpus'], encoding='utf-8') as f:
+        text = f.read()
+    with open(f"{out_dir}/upper.txt", 'w', encoding='utf-8') as f:
+        f.write(text.upper() + suffix)
+
+def _join(out_dir, inputs):
+    parts = []
+    for name in sorted(inputs):
+        with open(inputs[name], encoding='utf-8') as f:
+            parts.append(f.read())
+    with open(f"{out_dir}/joined.txt", 'w', encoding='utf-8') as f:
+        f.write('|'.join(parts))
+
+def _graph(tmp_path, langs, suffix=''):
+    graph = Graph(ArtifactStore(str(tmp_path / 'artifacts')))
+    for lang in langs:
+        path = tmp_path / f"{lang}.txt"
+        if not path.exists():
+            path.write_text(lang, encoding='utf-8')
+        graph.add(Task(f"upper:{lang}", _upper, {'corpus': str(path)}, {'suffix': suffix}))
+    graph.add(Task('join', _join, {lang: Output(f"upper:{lang}", 'upper.txt') for lang in langs}))
+    return graph
+
+def _joined(graph):
+    with open(graph.path(Output('join', 'joined.txt')), encoding='utf-8') as f:
+        return f.read()
+
+def test_unchanged_graph_is_served_from_the_store(tmp_path):
+    first = _graph(tmp_path, ['go', 'python'])
+    first.run(workers=1)
+    assert sorted(first.ran) == ['join', 'upper:go', 'upper:python']
+
+    second = _graph(tmp_path, ['go', 'python'])
+    second.run(workers=1)
+    assert second.ran == []
+    assert _joined(second) == 'GO|PYTHON'
+
+def test_parameter_change_reruns_the_task_and_its_dependents(tmp_path):
+    _graph(tmp_path, ['go', 'python']).run(workers=1)
+    graph = _graph(tmp_path, ['go', 'python'], suffix='!')
+    graph.run(workers=1)
+    assert sorted(graph.ran) == ['join', 'upper:go', 'upper:python']
+    assert _joined(graph) == 'GO!|PYTHON!'
+
+def test_input_change_reruns_only_the_affected_tasks(tmp_path):
+    _graph(tmp_path, ['go', 'python']).run(workers=1)
+    (tmp_path / 'go.txt').write_text('golang', encoding='utf-8')
+    graph = _graph(tmp_path, ['go', 'python'])
+    graph.run(workers=1)
+    assert sorted(graph.ran) == ['join', 'upper:go']
+    assert _joined(graph) == 'GOLANG|PYTHON'
+
+def test_adding_a_language_reruns_only_its_tasks(tmp_path):
+    _graph(tmp_path, ['go', 'python']).run(workers=1)
+    graph = _graph(tmp_path, ['go', 'python', 'rust'])
+    graph.run(workers=2)
+    assert sorted(graph.ran) == ['join', 'upper:rust']
+    assert sorted(graph.cached) == ['upper:go', 'upper:python']
+    assert _joined(graph) == 'GO|PYTHON|RUST'
+
+def test_failed_task_leaves_nothing_in_the_store(tmp_path):
+    def _fail(out_dir, inputs):
+        raise RuntimeError('boom')
+
+    graph = _graph(tmp_path, ['go'])
+    graph.add(Task('fail', _fail, {'joined': Output('join', 'joined.txt')}))
+    with pytest.raises(RuntimeError):
+        graph.run(workers=1)
+    assert not any((tmp_path / 'artifacts' / 'tmp').iterdir())
+
+    # 失敗したタスクの前までの出力は保存されている
+    rerun = _graph(tmp_path, ['go'])
+    rerun.run(workers=1)
+    assert rerun.ran == []
@@ -0,0 +1,21 @@
+from koudo.counting import count_files, count_text, top_n
+from koudo.withword2vec import get_top_words, top_words_of_files
+
+TEXT = "Rust java Python the java rust zig python Java and rust ZIG"
+
+def test_count_text_lowercases_and_skips_stop_words():
+    assert count_text(TEXT, frozenset({'the', 'and'})) == {'rust': 3, 'java': 3, 'python': 2, 'zig': 2}
+
+def test_blocks_count_like_the_whole_file(tmp_path):
+    path = tmp_path / 'corpus.txt'
+    path.write_text(TEXT * 50, encoding='utf-8')
+    counts = count_files({'corpus': str(path)}, workers=1, block_size=64)
+    assert counts['corpus'] == count_text(TEXT * 50)
+
+def test_text_and_file_paths_break_ties_the_same_way(tmp_path):
+    path = tmp_path / 'corpus.txt'
+    path.write_text(TEXT, encoding='utf-8')
+    from_texts = get_top_words({'corpus': TEXT}, top_n=3, workers=1)['corpus']
+    from_files = top_words_of_files({'corpus': str(path)}, top_n=3, workers=1)['corpus']
+    assert from_texts == from_files == ['rust', 'java', 'python']
+    assert top_n(count_text(TEXT), 1) == [('rust', 3)]
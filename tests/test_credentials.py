@@ -0,0 +1,66 @@
+import time
+
+import pytest
+
+from koudo.credentials import NoUsableTokenError, TokenPool
+
+def test_secondary_rate_limit_pauses_instead_of_quarantining():
+    pool = TokenPool(['token-a'])
+    pool.update('token-a', {'X-RateLimit-Remaining': '4000'}, 403, 'core', secondary_rate_limit=True)
+    assert pool.available() == 1
+    state = pool.status()[0]
+    assert state['remaining']['core'] == 0
+    assert state['reset']['core'] > time.time() + 50
+
+def test_permission_error_keeps_the_token():
+    pool = TokenPool(['token-a'])
+    pool.update('token-a', {'X-RateLimit-Remaining': '4000'}, 403, 'core')
+    assert pool.available() == 1
+    assert pool.acquire('core') == 'token-a'
+
+def test_rejected_pool_raises_instead_of_going_anonymous():
+    pool = TokenPool(['token-a', 'token-b'])
+    pool.update('token-a', {}, 401)
+    assert pool.acquire('core') == 'token-b'
+    pool.update('token-b', {}, 401)
+    with pytest.raises(NoUsableTokenError):
+        pool.acquire('core')
+
+def test_empty_pool_sends_without_token():
+    assert TokenPool([]).acquire('core') is None
+
+class _Response:
+    def __init__(self, status_code: int, body: str = '{}', headers: dict | None = None):
+        self.status_code = status_code
+        self.text = body
+        self.content = body.encode('utf-8')
+        self.headers = headers or {}
+
+    def json(self):
+        return {}
+
+def _fetch(monkeypatch, pool, responses):
+    from koudo import scraping
+    from koudo.retry import HTTPStatusError, RetryPolicy
+
+    sent = []
+    def get(url, headers):
+        sent.append(headers['Authorization'])
+        return responses[len(sent) - 1]
+    monkeypatch.setattr(scraping.requests, 'get', get)
+    try:
+        scraping.fetch_data_from_github('https://api.github.com/repos/o/r', pool=pool, policy=RetryPolicy(max_retries=0, max_rate_limit_waits=0))
+    except HTTPStatusError:
+        pass
+    return sent
+
+def test_permission_error_is_not_retried_with_other_tokens(monkeypatch):
+    pool = TokenPool(['token-a', 'token-b', 'token-c'])
+    forbidden = _Response(403, '{"message": "Resource not accessible by personal access token"}', {'X-RateLimit-Remaining': '4000'})
+    assert len(_fetch(monkeypatch, pool, [forbidden] * 3)) == 1
+
+def test_rate_limited_token_is_rotated(monkeypatch):
+    pool = TokenPool(['token-a', 'token-b'])
+    limited = _Response(403, '{"message": "You have exceeded a secondary rate limit"}', {'X-RateLimit-Remaining': '4000'})
+    sent = _fetch(monkeypatch, pool, [limited, _Response(200)])
+    assert len(sent) == 2 and sent[0] != sent[1]
@@ -0,0 +1,26 @@
+import numpy as np
+
+from koudo.embeddings import MappedVectors, lookup_vectors, save_vectors
+
+class _Vectors:
+    def __init__(self, words: list[str]):
+        self.index_to_key = words
+        self.vectors = np.arange(len(words) * 2, dtype=np.float32).reshape(len(words), 2)
+
+def _load(tmp_path, words: list[str]) -> MappedVectors:
+    return MappedVectors.load(save_vectors(_Vectors(words), str(tmp_path / 'vectors.npy')))
+
+def test_lookup_finds_vocabulary_words(tmp_path):
+    wv = _load(tmp_path, ['python', 'go', 'rust'])
+    assert wv.key_to_index.lookup(['rust', 'python', 'go']).tolist() == [2, 0, 1]
+    assert wv.key_to_index['go'] == 1
+
+def test_longer_word_with_vocabulary_prefix_is_not_found(tmp_path):
+    wv = _load(tmp_path, ['python', 'go', 'rust'])
+    assert 'pythonista' not in wv
+    assert 'pythonic' not in wv
+    assert wv.key_to_index.lookup(['pythonista', 'python']).tolist() == [-1, 0]
+
+    vectors, labels = lookup_vectors(wv, ['pythonista', 'go', 'rusty'])
+    assert labels == ['go']
+    assert vectors.tolist() == [[2.0, 3.0]]
@@ -0,0 +1,28 @@
+import os
+import subprocess
+import sys
+
+import koudo
+
+# サブコマンドの中でだけ import する重いライブラリ
+HEAVY_MODULES = ('matplotlib', 'pandas', 'numpy', 'sklearn', 'gensim', 'wordcloud')
+
+def _imported_modules(statement: str) -> list[str]:
+    src = os.path.dirname(os.path.dirname(koudo.__file__))
+    env = {**os.environ, 'PYTHONPATH': os.pathsep.join(filter(None, [src, os.environ.get('PYTHONPATH')]))}
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', statement],
+        capture_output=True, text=True, env=env, check=True,
+    )
+    # "import time: self [us] | cumulative | imported package" の 3 列目
+    return [
+        line.rsplit('|', 1)[-1].strip()
+        for line in result.stderr.splitlines()
+        if line.startswith('import time:') and '|' in line
+    ]
+
+def test_cli_import_does_not_load_heavy_libraries():
+    modules = _imported_modules('import koudo.cli')
+    assert 'koudo.cli' in modules
+    loaded = sorted({m.split('.')[0] for m in modules} & set(HEAVY_MODULES))
+    assert not loaded, f"koudo.cli imports {loaded} at startup"
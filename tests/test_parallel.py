@@ -0,0 +1,28 @@
+import os
+
+from koudo.parallel import map_languages
+from koudo.profiling import tracer
+
+def _length(lang, text, scale=1):
+    with tracer.span('length', lang=lang):
+        return len(text) * scale
+
+def test_results_keep_the_order_of_items():
+    items = {'python': 'abc', 'go': 'de', 'C': 'f'}
+    assert list(map_languages(_length, items, workers=2, scale=2).items()) == [('python', 6), ('go', 4), ('C', 2)]
+
+def test_worker_spans_are_merged_into_the_tracer():
+    tracer.enable()
+    tracer.clear()
+    try:
+        with tracer.span('parent'):
+            map_languages(_length, {'python': 'abc', 'go': 'de'}, workers=2)
+        spans = {s.name: s for s in tracer.spans}
+        workers = [s for s in tracer.spans if s.name == 'length']
+        assert sorted(s.args['lang'] for s in workers) == ['go', 'python']
+        assert all(s.pid not in (0, os.getpid()) for s in workers)
+        parent = spans['parent']
+        assert all(parent.start <= s.start <= parent.start + parent.duration for s in workers)
+    finally:
+        tracer.enabled = False
+        tracer.clear()
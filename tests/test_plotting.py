@@ -0,0 +1,29 @@
+import os
+import subprocess
+import sys
+
+import koudo
+
+SCRIPT = """
+import sys
+import matplotlib
+from koudo.plotting import figure, save_figure
+with figure((4, 3)) as fig:
+    fig.add_subplot(1, 1, 1).plot([1, 2])
+    save_figure(fig, sys.argv[1])
+pyplot = 'matplotlib.pyplot' in sys.modules
+print(matplotlib.get_backend(), pyplot)
+"""
+
+def _run(tmp_path, backend: str) -> str:
+    src = os.path.dirname(os.path.dirname(koudo.__file__))
+    env = {**os.environ, 'MPLBACKEND': backend, 'PYTHONPATH': src}
+    result = subprocess.run([sys.executable, '-c', SCRIPT, str(tmp_path / 'plot.png')], capture_output=True, text=True, env=env, check=True)
+    return result.stdout.strip()
+
+def test_plotting_keeps_the_host_backend(tmp_path):
+    assert _run(tmp_path, 'svg') == 'svg False'
+    assert (tmp_path / 'plot.png').stat().st_size > 0
+
+def test_plotting_works_with_empty_mplbackend(tmp_path):
+    assert _run(tmp_path, '').endswith('False')
@@ -0,0 +1,51 @@
+import time
+
+import requests
+
+from koudo.retry import RetryPolicy, is_secondary_rate_limit, request_with_retry
+
+def _response(status: int, body: str = '', headers: dict | None = None) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status
+    response._content = body.encode('utf-8')
+    response.headers.update(headers or {})
+    return response
+
+SECONDARY = '{"message": "You have exceeded a secondary rate limit. Please wait a few minutes before you try again."}'
+
+def test_secondary_rate_limit_without_retry_after_waits_a_minute():
+    response = _response(403, SECONDARY, {'X-RateLimit-Remaining': '4321', 'X-RateLimit-Reset': '0'})
+    assert is_secondary_rate_limit(response)
+    assert RetryPolicy().delay(0, response) >= 60.0
+
+def test_retry_after_takes_precedence():
+    response = _response(403, SECONDARY, {'Retry-After': '5'})
+    assert 5.0 <= RetryPolicy().delay(0, response) <= 6.0
+
+def test_permission_error_is_not_retried():
+    response = _response(403, '{"message": "Resource not accessible by personal access token"}', {'X-RateLimit-Remaining': '4321'})
+    assert not is_secondary_rate_limit(response)
+    assert RetryPolicy().delay(0, response) is None
+
+def test_rate_limit_waits_are_not_capped():
+    policy = RetryPolicy()
+    assert policy.delay(0, _response(403, '', {'Retry-After': '300'})) >= 300.0
+    reset = str(int(time.time()) + 3600)
+    assert policy.delay(0, _response(403, '', {'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset': reset})) >= 3590.0
+
+def test_rate_limit_waits_do_not_use_up_retries(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(time, 'sleep', sleeps.append)
+    responses = iter([_response(429, '', {'Retry-After': '1'})] * 4 + [_response(200)])
+    response = request_with_retry(lambda: next(responses), RetryPolicy(max_retries=1))
+    assert response.status_code == 200
+    assert len(sleeps) == 4
+
+def test_server_errors_still_give_up_after_max_retries(monkeypatch):
+    monkeypatch.setattr(time, 'sleep', lambda seconds: None)
+    calls = []
+    def send():
+        calls.append(1)
+        return _response(502)
+    assert request_with_retry(send, RetryPolicy(max_retries=2)).status_code == 502
+    assert len(calls) == 3
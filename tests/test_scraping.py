@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from koudo.scraping import make_windows
+
+def _days(*dates: str) -> list:
+    return [np.datetime64(d, 's') for d in dates]
+
+@pytest.mark.parametrize('freq, expected', [
+    ('daily', _days('2024-01-01', '2024-01-02', '2024-01-03', '2024-01-04')),
+    ('weekly', _days('2024-01-01', '2024-01-04')),
+    ('monthly', _days('2024-01-01', '2024-01-04')),
+])
+def test_end_day_is_included_and_not_exceeded(freq, expected):
+    assert make_windows('2024-01-01', '2024-01-03', freq).tolist() == [e.item() for e in expected]
+
+def test_monthly_windows_follow_calendar_months_within_the_range():
+    edges = make_windows('2024-01-15', '2024-03-10T05:00:00Z', 'monthly')
+    assert edges.tolist() == [e.item() for e in _days('2024-01-15', '2024-02-01', '2024-03-01', '2024-03-11')]
+
+def test_weekly_last_window_stops_after_end_day():
+    edges = make_windows('2024-01-01', '2024-01-10', 'weekly')
+    assert edges[-1] == np.datetime64('2024-01-11', 's')
+
+def test_end_before_start_is_rejected():
+    with pytest.raises(ValueError):
+        make_windows('2024-01-10', '2024-01-01', 'daily')
+
+def _item(created_at: str, pr: bool = False) -> dict:
+    item = {'created_at': created_at}
+    if pr:
+        item['pull_request'] = {}
+    return item
+
+PAGES = {
+    'page1': ({'Link': '<page2>; rel="next"'}, [_item('2024-01-01T10:00:00Z'), _item('2024-01-02T09:00:00Z', pr=True), _item('2024-01-03T23:59:59Z')]),
+    'page2': ({'Link': '<page3>; rel="next"'}, [_item('2024-01-04T00:00:00Z'), _item('2024-01-04T12:00:00Z', pr=True), _item('2024-01-06T00:00:00Z', pr=True)]),
+    'page3': ({}, [_item('2024-01-07T00:00:00Z')]),
+}
+
+def _mock_pages(monkeypatch) -> list[str]:
+    from koudo import scraping
+
+    fetched = []
+    def fetch(url):
+        page = 'page1' if url.startswith('https://') else url
+        fetched.append(page)
+        return PAGES[page]
+    monkeypatch.setattr(scraping, 'fetch_data_from_github', fetch)
+    return fetched
+
+def test_created_counts_split_prs_and_stop_after_the_last_window(monkeypatch):
+    from koudo.scraping import get_created_counts_by_window
+
+    fetched = _mock_pages(monkeypatch)
+    counts = get_created_counts_by_window('o', 'r', make_windows('2024-01-01', '2024-01-04', 'daily'))
+    assert fetched == ['page1', 'page2']
+    assert counts['prs'].tolist() == [0, 1, 0, 1]
+    assert counts['issues'].tolist() == [1, 0, 1, 1]
+
+def test_windowed_counts_are_stored_per_window(monkeypatch):
+    from koudo.scraping import get_windowed_counts
+    from koudo.store import ResultStore
+
+    store = ResultStore(':memory:')
+    fetched = _mock_pages(monkeypatch)
+    edges, first = get_windowed_counts('o', 'r', '2024-01-01', '2024-01-04', 'daily', store)
+    assert len(fetched) == 2
+    assert store.get('o', 'r', '2024-01-02T00:00:00Z', '2024-01-03T00:00:00Z', 'window:prs') == 1
+
+    _, second = get_windowed_counts('o', 'r', '2024-01-01', '2024-01-04', 'daily', store)
+    assert len(fetched) == 2
+    assert {m: v.tolist() for m, v in second.items()} == {m: v.tolist() for m, v in first.items()}